@@ -1,58 +1,541 @@
 import string
 from utils import (
-    AgentState, 
+    AgentState,
     AIMessage,
-    competitiveBidMaker, 
-    get_next_api_key,
+    competitiveBidMaker,
+    get_next_api_keys,
     load_prompts,
     get_raise_amount,
+    is_valid_raise,
     BidderInput,
-    get_set_name
+    BidHistoryEntry,
+    BIDDER_JSON_SCHEMA,
+    bidder_input_from_json,
+    get_set_name,
+    get_team_budgets,
+    TEAMS,
+    MAX_SQUAD_SIZE,
+    MIN_SQUAD_SIZE,
+    MIN_RESERVE_PRICE_CR,
+    DEBUG
 )
+import functools
 import json
+try:
+    import orjson
+except ImportError:  # Optional speedup; fall back to the stdlib encoder
+    orjson = None
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
 from langchain_core.messages import HumanMessage, SystemMessage
-from model_config import MODEL_NAME, TEMPERATURE, TOP_P, MAX_TOKENS, EXTRA_BODY, WAIT_BETWEEN_REQUESTS
-import time
+from model_config import MODEL_NAME, TEMPERATURE, TOP_P, MAX_TOKENS, EXTRA_BODY, REQUESTS_PER_MINUTE, REQUEST_BURST, ENABLE_BID_PREFILTER, MAX_CONCURRENT_REQUESTS, STREAM_BID_DECISIONS
+import asyncio
+import threading
 import random
+import time
+import traceback
 
+# Structured-output bidder clients keyed by API key index. Building a ChatNVIDIA
+# validates the model against the endpoint's model list, so each key's client is
+# built once and reused for every round.
+_LLM_CACHE = {}
+_LLM_CACHE_LOCK = threading.Lock()
 
-def agent_pool(state: AgentState) -> AgentState:
+# Event loop reused by every agent_pool call to drive the concurrent team requests
+_EVENT_LOOP = None
+
+_BANNER = "=" * 60
+
+
+class TokenBucket:
+    """Reservation-style token bucket: callers take a token now and are told how long to wait for it.
+
+    Tokens refill continuously at `rate` per second up to `burst`. When the bucket is empty the
+    token is borrowed from the future, so concurrent callers queue up at exactly the refill rate.
     """
-    Agent pool node that processes teams sequentially and returns the FIRST bid found.
-    Optimized for speed - stops immediately when any team raises a bid.
-    For first bid, minimum raise is zero (can bid at base price).
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Reserve one token and return the number of seconds to wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def release(self) -> None:
+        """Give back a reserved token that was never used, e.g. for a request cancelled before sending."""
+        with self.lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+
+# One bucket per API key index, so each key is paced against its own rate limit
+_BUCKETS = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def _get_bucket(api_key_id: int) -> TokenBucket:
+    """Return the rate-limit bucket for an API key, creating it on first use."""
+    bucket = _BUCKETS.get(api_key_id)
+    if bucket is None:
+        with _BUCKETS_LOCK:
+            bucket = _BUCKETS.setdefault(api_key_id, TokenBucket(REQUESTS_PER_MINUTE / 60.0, REQUEST_BURST))
+    return bucket
+
+
+def _get_bidder_llm(api_key: str, api_key_id: int):
+    """Return the cached structured-output bidder LLM for an API key, creating it on first use."""
+    llm = _LLM_CACHE.get(api_key_id)
+    if llm is None:
+        with _LLM_CACHE_LOCK:
+            llm = _LLM_CACHE.get(api_key_id)
+            if llm is None:
+                llm = ChatNVIDIA(
+                    model=MODEL_NAME,
+                    temperature=TEMPERATURE,
+                    top_p=TOP_P,
+                    max_tokens=MAX_TOKENS,
+                    api_key=api_key,
+                    extra_body=EXTRA_BODY,
+                ).with_structured_output(BIDDER_JSON_SCHEMA)
+                _LLM_CACHE[api_key_id] = llm
+    return llm
+
+
+def _dumps(obj) -> str:
+    """Serialize prompt context to compact JSON (non-ASCII kept as-is), via orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _compile_template(template_raw: str) -> list:
+    """Split a string.Template source into literal text and placeholder names once.
+
+    Literals are kept as str and placeholders as 1-tuples holding the name, so rendering
+    is a plain join with no regex scan. Escapes and errors follow string.Template.
+    """
+    segments = []
+    pos = 0
+    for match in string.Template.pattern.finditer(template_raw):
+        literal = template_raw[pos:match.start()]
+        name = match.group('named') or match.group('braced')
+        if name is not None:
+            segments.append(literal)
+            segments.append((name,))
+        elif match.group('escaped') is not None:
+            segments.append(literal + string.Template.delimiter)
+        else:
+            raise ValueError(f"Invalid placeholder in prompt template at index {match.start()}")
+        pos = match.end()
+    segments.append(template_raw[pos:])
+    return [seg for seg in segments if seg != ""]
+
+
+def _render_template(segments: list, subs: dict) -> str:
+    """Fill a template compiled by _compile_template; same output as Template.substitute."""
+    return "".join(seg if isinstance(seg, str) else str(subs[seg[0]]) for seg in segments)
+
+
+@functools.lru_cache(maxsize=1)
+def _team_prompts() -> dict:
+    """Load the prompt files once, pre-build each team's system message and pre-compile its human template.
+
+    Returns:
+        dict[str, tuple[SystemMessage, list]]: team_id -> (system message, compiled human
+        template segments)
     """
     prompts = load_prompts()
+    team_prompts = {}
+    for team_id in TEAMS:
+        team_prompts[team_id] = (
+            SystemMessage(content=prompts[f'{team_id}_sys']),
+            _compile_template(prompts[f'{team_id}_human']),
+        )
+    return team_prompts
+
+
+# Per-team prompt views of each squad, reused until the roster changes:
+# team_id -> (players, own-team view JSON, other-team view JSON). Players are fully populated
+# before they join a squad and never mutated afterwards, so the same roster (same objects in
+# the same order) always projects to the same JSON.
+_SQUAD_VIEW_CACHE = {}
+
+
+def _player_views(p) -> tuple:
+    """Project one player into its (own-team, other-team) prompt dicts."""
+    try:
+        name = p.name
+    except Exception:
+        name = str(p)
+
+    # Include more details for own team to help with strategy
+    own = {
+        "name": name,
+        "specialism": getattr(p, 'specialism', 'Unknown'),
+        "player_status": getattr(p, 'player_status', 'Unknown'),
+        "sold_price": getattr(p, 'sold_price', 0.0),
+        "reason": getattr(p, 'reason_for_purchase', None)
+    }
+    # For other teams provide minimal player info: specialism, sold_price, player_status
+    other = {
+        "name": name,
+        "specialism": getattr(p, 'specialism', None),
+        "sold_price": getattr(p, 'sold_price', None),
+        "player_status": getattr(p, 'player_status', None),
+        "ipl_matches": getattr(p, 'ipl_matches', None),
+    }
+    return own, other
+
+
+def _project_squads(state: AgentState) -> tuple:
+    """Serialize every team's squad into the prompt views, re-projecting only changed rosters.
+
+    Returns:
+        tuple[dict, dict]: (own-team view JSON, other-team view JSON), each mapping team_id
+        to a JSON string carrying only the fields the prompt uses.
+    """
+    own_json = {}
+    other_json = {}
+    for t in TEAMS:
+        players = tuple(state.get(t, []))
+        cached = _SQUAD_VIEW_CACHE.get(t)
+        if cached is None or len(cached[0]) != len(players) or any(a is not b for a, b in zip(cached[0], players)):
+            views = [_player_views(p) for p in players]
+            cached = (players, _dumps([own for own, _ in views]), _dumps([other for _, other in views]))
+            _SQUAD_VIEW_CACHE[t] = cached
+        own_json[t] = cached[1]
+        other_json[t] = cached[2]
+    return own_json, other_json
+
+
+# Reason prefix of the passes recorded by _should_query_llm's prefilter
+_AUTO_PASS_PREFIX = "Auto-pass"
+
+
+def _render_bid_history(history: list) -> str:
+    """Render one team's bid history entries for a player, one line per entry."""
+    lines = []
+    for entry in history:
+        if entry.decision == "raise":
+            raise_info = "Normal raise" if entry.is_normal else f"Custom raise (+{entry.raised_amount} Cr)"
+            lines.append(f"  Round {entry.round} (at {entry.current_price} Cr): {raise_info} - {entry.reason}\n")
+        else:
+            lines.append(f"  Round {entry.round} (at {entry.current_price} Cr): PASSED - {entry.reason}\n")
+    return "".join(lines)
+
+
+def _round_context(state: AgentState, budgets: dict, other_json: dict, current_price: float, min_bid_raise: float, next_bid_price: float) -> dict:
+    """Compute the prompt values that are identical for every team in a round.
+
+    Returns:
+        dict: the stringified template substitutions shared by all teams (player details,
+        pricing, set names, players left in the set) plus each team's budget, serialized
+        other-team view and bid history lines, so per-team prompts only join them
+    """
+    current_player = state.get("CurrentPlayer")
+    current_set_abbr = state.get('CurrentSet')
+    remaining_sets_full_names = get_set_name(state.get('RemainingSets', []))
+    remaining_players_list = state.get('RemainingPlayersInSet', [])
+
+    # One pass over the teams renders every per-team fragment; each team's history reads the
+    # same to every other team, so it is rendered once here. Prefilter auto-passes are local
+    # skips, not decisions the team made, so they only appear in the team's own history
+    team_bid_history = current_player.team_bid_history
+    squad_lines = {}
+    budget_lines = {}
+    history_blocks = {}
+    own_histories = {}
+    for t in TEAMS:
+        squad_lines[t] = f"{t}: {other_json[t]}\n"
+        budget_lines[t] = f"{t}: {budgets[t]}\n"
+        history = team_bid_history.get(t)
+        if history:
+            rendered = _render_bid_history(history)
+            own_histories[t] = f"Your team's bidding history for this player:\n{rendered}"
+            shown = [entry for entry in history if not entry.reason.startswith(_AUTO_PASS_PREFIX)]
+            if shown:
+                shown_text = rendered if len(shown) == len(history) else _render_bid_history(shown)
+                history_blocks[t] = f"\n{t}'s bidding history:\n{shown_text}"
+
+    # Every substitution that doesn't depend on the team, stringified once for the round
+    base_subs = {
+        'player_name': current_player.name,
+        'specialism': current_player.specialism,
+        'batting_style': current_player.batting_style,
+        'bowling_style': current_player.bowling_style,
+        'test_caps': current_player.test_caps,
+        'odi_caps': current_player.odi_caps,
+        't20_caps': current_player.t20_caps,
+        'ipl_matches': current_player.ipl_matches,
+        'player_status': current_player.player_status,
+        'reserve_price_lakh': current_player.reserve_price_lakh,
+        'reserve_price_cr': current_player.reserve_price_lakh / 100,
+        'current_price': current_price,
+        'min_bid_raise': min_bid_raise,
+        'next_bid_price': next_bid_price,
+        'current_set': get_set_name(current_set_abbr) if current_set_abbr else "N/A",
+        'remaining_sets': ", ".join(remaining_sets_full_names) if remaining_sets_full_names else "None",
+        # Format remaining players in set more cleanly
+        'remaining_in_set_players': ", ".join([f"{p.name} ({p.specialism})" for p in remaining_players_list]) if remaining_players_list else "None",
+        'player_stats': current_player.stats,
+    }
+
+    return {
+        'base_subs': {k: str(v) for k, v in base_subs.items()},
+        'budgets': budgets,
+        'squad_lines': squad_lines,
+        'budget_lines': budget_lines,
+        'history_blocks': history_blocks,
+        'own_histories': own_histories,
+    }
+
+
+def _build_team_messages(state: AgentState, team_id: str, own_json: dict, round_ctx: dict) -> list:
+    """Build the system + human messages for one team's bid evaluation."""
+    # Prepare context for this team
+    budget = round_ctx['budgets'][team_id]
+    squad = state.get(team_id, [])
+
+    squad_lines = round_ctx['squad_lines']
+    budget_lines = round_ctx['budget_lines']
+    other_team_compositions = "".join(squad_lines[t] for t in TEAMS if t != team_id)
+    other_team_budgets = "".join(budget_lines[t] for t in TEAMS if t != team_id)
+
+    # Other teams' bid history for this player, pre-rendered per team for the round
+    history_blocks = round_ctx['history_blocks']
+    other_teams_intentions = "".join(history_blocks[t] for t in TEAMS if t != team_id and t in history_blocks)
+    if not other_teams_intentions:
+        other_teams_intentions = "First bidding opportunity - No other teams have bid yet. You have a strategic advantage to set the value for this player."
+
+    # This team's own bid history for this player
+    own_bid_history = round_ctx['own_histories'].get(
+        team_id,
+        "This is your first opportunity to bid on this player. You can set your bidding strategy from the start."
+    )
+
+    # Static system message (no player-specific substitutions) is built once and shared across rounds;
+    # the human template is compiled once and filled with the round's shared values plus this team's own
+    sys_message, human_segments = _team_prompts()[team_id]
+    human_subs = {
+        **round_ctx['base_subs'],
+        'team_composition': own_json[team_id],
+        'slots_filled': len(squad),
+        'slots_remaining': MAX_SQUAD_SIZE - len(squad),
+        'budget': budget,
+        'other_team_compositions': other_team_compositions,
+        'other_team_budgets': other_team_budgets,
+        'other_teams_intentions': other_teams_intentions,
+        'own_bid_history': own_bid_history
+    }
+    human_msg = _render_template(human_segments, human_subs)
+    return [sys_message, HumanMessage(content=human_msg)]
+
+
+def _should_query_llm(budget: float, squad_size: int, next_bid_price: float) -> tuple:
+    """Cheap local check for bids the model is bound to pass on.
+
+    Conservative by construction: a team is only ruled out if, after paying next_bid_price, even
+    buying every remaining slot up to MIN_SQUAD_SIZE at the pool's lowest reserve price would
+    exceed what is left of its budget.
+
+    Returns:
+        tuple[bool, str]: (whether to ask the LLM, reason for the pass when not)
+    """
+    slots_after = max(0, MIN_SQUAD_SIZE - squad_size - 1)
+    if budget - next_bid_price < slots_after * MIN_RESERVE_PRICE_CR:
+        return False, (
+            f"{_AUTO_PASS_PREFIX}: bidding INR {next_bid_price:.2f} Cr would leave too little to fill "
+            f"{slots_after} more slots to reach the {MIN_SQUAD_SIZE}-player minimum"
+        )
+    return True, ""
+
+
+def _log_team_error(team_id: str, error: BaseException) -> None:
+    """Print the full traceback for a team's failed evaluation, only when DEBUG is on."""
+    if DEBUG:
+        print(f"[AGENT_POOL] {team_id} error traceback:\n" + "".join(traceback.format_exception(error)), flush=True)
+
+
+def _is_accepted_raise(bid_decision, min_bid_raise: float) -> bool:
+    """True if a parsed decision is a raise that passes the minimum-raise rule."""
+    return (
+        isinstance(bid_decision, BidderInput)
+        and bid_decision.is_raise
+        and is_valid_raise(True, bid_decision.is_normal, bid_decision.raised_amount, min_bid_raise)
+    )
+
+
+# Reason recorded for a decision that streamed in before its request failed without any reason text
+_CUT_SHORT_REASON = "No reason received (the response was cut short after the decision)"
+
+
+def _decision_settled(data: dict) -> bool:
+    """True once a partial bid object's decision can no longer change.
+
+    Guided decoding emits the schema's fields in order. A pass is final as soon as is_raise is
+    false (a partial object only carries completed literals); a raise needs is_normal and
+    raised_amount too, which are complete once the trailing "reason" key shows up.
+    """
+    return data.get("is_raise") is False or "reason" in data
+
+
+async def _stream_decision(job: dict):
+    """Stream the structured bid and publish it on job["decided"] once its decision is settled."""
+    data = None
+    async for data in job["llm"].astream(job["messages"]):
+        if not job["decided"].done() and isinstance(data, dict) and _decision_settled(data):
+            job["decided"].set_result(bidder_input_from_json(data))
+    return data
+
+
+async def _evaluate_team(job: dict, semaphore: asyncio.Semaphore):
+    """Query this team's LLM for its bid decision.
+
+    The key's rate-limit token is taken once a concurrency slot is free, right before the
+    request is sent, so teams that are cancelled while still queued never use one. A team
+    cancelled while waiting for its token hands it back.
+    """
+    async with semaphore:
+        bucket = _get_bucket(job["api_key_id"])
+        delay = bucket.acquire()
+        if delay:  # Rate limiting - only waits when the key is out of tokens
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                bucket.release()
+                raise
+        if STREAM_BID_DECISIONS:
+            return bidder_input_from_json(await _stream_decision(job))
+        return bidder_input_from_json(await job["llm"].ainvoke(job["messages"]))
+
+
+def _decision_before_failure(job: dict):
+    """The decision streamed in for a job whose request then failed, or None if it never settled."""
+    if not job["decided"].done():
+        return None
+    bid_decision = job["decided"].result()
+    if bid_decision is not None and not bid_decision.reason:
+        bid_decision = bid_decision.model_copy(update={"reason": _CUT_SHORT_REASON})
+    return bid_decision
+
+
+async def _collect_bids(jobs: list, tasks: list, min_bid_raise: float) -> list:
+    """Collect the teams' results in processing order, up to the first valid raise.
+
+    The scan moves on as soon as a team's decision is settled: a streamed pass does not hold it
+    up while its reason is still arriving, and a streamed raise ends it straight away. Requests
+    for the teams after the raise are then cancelled since their answers would be discarded.
+    The scanned teams' full responses are awaited last. If a request fails after its decision
+    streamed in, the streamed decision is kept (with a placeholder reason if none had arrived).
+    Other failures are returned in place of results.
+    """
+    scanned = len(tasks)
+    try:
+        for i, (job, task) in enumerate(zip(jobs, tasks)):
+            await asyncio.wait({task, job["decided"]}, return_when=asyncio.FIRST_COMPLETED)
+            if job["decided"].done():
+                bid_decision = job["decided"].result()
+            elif task.exception() is None:
+                bid_decision = task.result()
+            else:
+                continue  # Failed before any decision; reported with the results below
+            if _is_accepted_raise(bid_decision, min_bid_raise):
+                scanned = i + 1
+                break
+        for later in tasks[scanned:]:
+            later.cancel()
+        results = []
+        for job, task in zip(jobs[:scanned], tasks[:scanned]):
+            try:
+                results.append(await task)
+            except Exception as e:
+                results.append(_decision_before_failure(job) or e)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return results
+
+
+async def _run_bids(state: AgentState, ordered_teams: list, own_json: dict, round_ctx: dict, min_bid_raise: float, message_lines: list) -> tuple:
+    """Start each team's request as soon as its prompt is ready, then collect the results.
+
+    Prompts are built in a worker thread, so requests already started are sent and awaited
+    while the next team's prompt is prepared.
+
+    Returns:
+        tuple[list, list]: (dispatched jobs in processing order, their results)
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    loop = asyncio.get_running_loop()
+    # Draw the round's API keys from the rotation in one step
+    api_keys = get_next_api_keys(len(ordered_teams))
+    jobs = []
+    tasks = []
+    for team_id, (api_key, api_key_id) in zip(ordered_teams, api_keys):
+        try:
+            if not api_key:
+                message_lines.append(f"  {team_id}: Error - No API key available.")
+                continue
+            job = {
+                "team_id": team_id,
+                "api_key_id": api_key_id,
+                "llm": _get_bidder_llm(api_key, api_key_id),
+                "messages": await asyncio.to_thread(_build_team_messages, state, team_id, own_json, round_ctx),
+            }
+        except Exception as e:
+            message_lines.append(f"  {team_id}: Error - {e!r}")
+            _log_team_error(team_id, e)
+            continue
+        job["decided"] = loop.create_future()
+        jobs.append(job)
+        tasks.append(asyncio.ensure_future(_evaluate_team(job, semaphore)))
+    return jobs, await _collect_bids(jobs, tasks, min_bid_raise)
+
+
+def _run_async(coro):
+    """Run a coroutine to completion on the module's persistent event loop."""
+    global _EVENT_LOOP
+    if _EVENT_LOOP is None or _EVENT_LOOP.is_closed():
+        _EVENT_LOOP = asyncio.new_event_loop()
+    return _EVENT_LOOP.run_until_complete(coro)
+
+
+def _publish(state: AgentState, message_lines: list) -> None:
+    """Join the round's message lines once, print them and store them as the node's message."""
+    body = "\n".join(message_lines)
+    print("[AGENT_POOL] Message:\n", body, sep="")
+    state["Messages"] = [AIMessage(content=body)]
+
+
+async def agent_pool_async(state: AgentState) -> AgentState:
+    """
+    Agent pool node that evaluates all eligible teams concurrently and returns the FIRST bid found.
+    Every team's request is in flight at once (capped by MAX_CONCURRENT_REQUESTS); responses are walked in
+    processing order and the first raise wins, exactly as the sequential greedy scan would pick it, with
+    the remaining requests cancelled.
+    For first bid, minimum raise is zero (can bid at base price).
+    """
     message_lines = []
     current_player = state.get("CurrentPlayer")
     if not current_player:
-        print("[AGENT_POOL] No current player, skipping", flush=True)
+        print("[AGENT_POOL] No current player, skipping")
         state["Messages"] = [AIMessage(content="AGENT POOL: No current player, skipping")]
         return state
-    
+
     current_bid = state.get("CurrentBid")
     current_bid_team = current_bid.team if current_bid else None
-    
-    message_lines.append("="*60)
-    message_lines.append("AGENT POOL - Bidding Round")
-    message_lines.append(f"Player: {current_player.name} ({current_player.specialism})")
-    message_lines.append(f"Reserve Price: {current_player.reserve_price_lakh / 100:.2f} Cr")
-    message_lines.append(f"Current bid: {f'INR {current_bid.current_bid_amount:.2f} by {current_bid.team}' if current_bid else 'No bids yet'}")
-    message_lines.append(f"Round: {state.get('Round')}")
-    
-    # Initialize or clear OtherTeamBidding
-    state["OtherTeamBidding"] = {}
-    
-    teams = ["CSK", "DC", "GT", "KKR", "LSG", "MI", "PBKS", "RR", "RCB", "SRH"]
-    
-    message_lines.append(f"Current bid holder: {current_bid_team if current_bid_team else 'None'}")
-    message_lines.append("Teams evaluating bids (Greedy Sequential Approach):")
 
-    # --- Start of greedy sequential execution ---
-    # Stagger requests to avoid rate limits
-    base_sleep_duration = WAIT_BETWEEN_REQUESTS  # seconds
-    
+    # Clear any bid left over from the previous round (single CompetitiveBidInfo or None)
+    state["OtherTeamBidding"] = None
+
     # Build list of eligible teams
     if current_bid:
         current_price = current_bid.current_bid_amount
@@ -63,20 +546,63 @@ def agent_pool(state: AgentState) -> AgentState:
         current_price = current_player.reserve_price_lakh / 100  # Convert lakhs to crores
         min_bid_raise = 0.0
         next_bid_price = current_price
-    
+
+    # Per-team skip reasons are only rendered in debug mode
     eligible_teams = []
-    for team_id in teams:
-        budget = state.get(f"{team_id}_Budget", 0.0)
-        if current_bid_team == team_id:
-            message_lines.append(f"  {team_id}: Skipped (current bid holder)")
-        elif budget < next_bid_price:
-            message_lines.append(f"  {team_id}: Skipped (insufficient budget: {budget} < required INR {next_bid_price:.2f})")
+    skip_lines = []
+    if DEBUG and current_bid_team:
+        skip_lines.append(f"  {current_bid_team}: Skipped (current bid holder)")
+    budgets = get_team_budgets(state)
+    for team_id in (t for t in TEAMS if t != current_bid_team):
+        budget = budgets[team_id]
+        if budget < next_bid_price:
+            if DEBUG:
+                skip_lines.append(f"  {team_id}: Skipped (insufficient budget: {budget} < required INR {next_bid_price:.2f})")
+        elif ENABLE_BID_PREFILTER and len(state.get(team_id, [])) >= MAX_SQUAD_SIZE:
+            # Outcome is a certain PASS, so don't spend an LLM call (or an API key slot) on it
+            if DEBUG:
+                skip_lines.append(f"  {team_id}: Skipped (squad full: {MAX_SQUAD_SIZE} players)")
         else:
-            eligible_teams.append(team_id)
-    
+            should_query, pass_reason = (
+                _should_query_llm(budget, len(state.get(team_id, [])), next_bid_price) if ENABLE_BID_PREFILTER else (True, "")
+            )
+            if should_query:
+                eligible_teams.append(team_id)
+            else:
+                # Record it in the team's own bid history (other teams' prompts leave it out),
+                # once per player: the price only rises, so later rounds would repeat the same entry
+                history = current_player.team_bid_history.setdefault(team_id, [])
+                if not any(entry.reason.startswith(_AUTO_PASS_PREFIX) for entry in history):
+                    history.append(BidHistoryEntry(
+                        round=state.get('Round', 0),
+                        decision="pass",
+                        reason=pass_reason,
+                        current_price=current_price
+                    ))
+                if DEBUG:
+                    skip_lines.append(f"  {team_id}: PASS - {pass_reason}")
+
+    if not eligible_teams:
+        # Nobody can bid: skip prompt building and dispatch entirely
+        message = f"No eligible teams for {current_player.name} at INR {next_bid_price:.2f}, skipping"
+        print(f"[AGENT_POOL] {message}")
+        state["Messages"] = [AIMessage(content=f"AGENT POOL: {message}")]
+        return state
+
+    message_lines.append(_BANNER)
+    message_lines.append("AGENT POOL - Bidding Round")
+    message_lines.append(f"Player: {current_player.name} ({current_player.specialism})")
+    message_lines.append(f"Reserve Price: {current_player.reserve_price_lakh / 100:.2f} Cr")
+    message_lines.append(f"Current bid: {f'INR {current_bid.current_bid_amount:.2f} by {current_bid.team}' if current_bid else 'No bids yet'}")
+    message_lines.append(f"Round: {state.get('Round')}")
+    message_lines.append(f"Current bid holder: {current_bid_team if current_bid_team else 'None'}")
+    message_lines.append("Teams evaluating bids (Concurrent Greedy Approach):")
+    message_lines.extend(skip_lines)
+
+    # --- Start of concurrent greedy execution ---
     # Order eligible teams by number of prior bids on this player (desc), shuffle ties
     bid_counts = {
-        team_id: sum(1 for entry in current_player.team_bid_history.get(team_id, []) if entry.get("decision") == "raise")
+        team_id: sum(1 for entry in current_player.team_bid_history.get(team_id, []) if entry.decision == "raise")
         for team_id in eligible_teams
     }
     buckets = {}
@@ -85,233 +611,64 @@ def agent_pool(state: AgentState) -> AgentState:
     ordered_teams = []
     for count in sorted(buckets.keys(), reverse=True):
         bucket = buckets[count]
-        random.shuffle(bucket)
+        if len(bucket) > 1:  # a lone team needs no tie-break
+            random.shuffle(bucket)
         ordered_teams.extend(bucket)
-    if ordered_teams:
-        message_lines.append("Processing order (by prior bids, ties random): " + ", ".join(ordered_teams))
+    message_lines.append("Processing order (by prior bids, ties random): " + ", ".join(ordered_teams))
 
-    for team_id in ordered_teams:
-        message_lines.append(f"\n  Checking {team_id}...")
-        
-        try:
-            time.sleep(base_sleep_duration)  # Rate limiting
-            
-            api_key, api_key_id = get_next_api_key()
-            if not api_key:
-                message_lines.append(f"  {team_id}: Error - No API key available.")
-                continue
+    # Shared prompt context is prepared once; each team's request starts as soon as its prompt is built
+    own_json, other_json = _project_squads(state)
+    round_ctx = _round_context(state, budgets, other_json, current_price, min_bid_raise, next_bid_price)
+    jobs, results = await _run_bids(state, ordered_teams, own_json, round_ctx, min_bid_raise, message_lines)
 
+    for job, bid_decision in zip(jobs, results):
+        team_id = job["team_id"]
+        api_key_id = job["api_key_id"]
+        if DEBUG:
+            message_lines.append(f"\n  Checking {team_id}...")
             message_lines.append(f"  {team_id}: Using NVIDIA API key #{api_key_id}")
 
-            llm = ChatNVIDIA(
-                model=MODEL_NAME,
-                temperature=TEMPERATURE,
-                top_p=TOP_P,
-                max_tokens=MAX_TOKENS,
-                api_key=api_key,
-                extra_body=EXTRA_BODY,
-            ).with_structured_output(BidderInput)
-            
-            # Prepare context for this team
-            budget = state.get(f"{team_id}_Budget", 0.0)
-            squad = state.get(team_id, [])
-            # Build a detailed squad summary for own team
-            squad_short = []
-            for p in squad:
-                try:
-                    name = p.name
-                except Exception:
-                    name = str(p)
-                
-                # Include more details for own team to help with strategy
-                specialism = getattr(p, 'specialism', 'Unknown')
-                player_status = getattr(p, 'player_status', 'Unknown')
-                sold_price = getattr(p, 'sold_price', 0.0)
-                reason = getattr(p, 'reason_for_purchase', None)
-                
-                squad_short.append({
-                    "name": name, 
-                    "specialism": specialism,
-                    "player_status": player_status,
-                    "sold_price": sold_price,
-                    "reason": reason
-                })
-            player_stats = current_player.stats
-            
-            # Update pricing for this team's evaluation
-            if current_bid:
-                current_price = current_bid.current_bid_amount
-                min_bid_raise = get_raise_amount(current_price)
-                next_bid_price = current_price + min_bid_raise
-            else:
-                # First bid opportunity - zero minimum raise
-                current_price = current_player.reserve_price_lakh / 100  # Convert lakhs to crores
-                min_bid_raise = 0.0
-                next_bid_price = current_price
-            
-            other_team_compositions = ""
-            other_team_budgets = ""
-            for t in teams:
-                if t != team_id:
-                    # For other teams, expose only name and reason per player
-                    other_team_squad = state.get(t, [])
-                    other_short = []
-                    for p in other_team_squad:
-                        try:
-                            name = p.name
-                        except Exception:
-                            name = str(p)
-                        # For other teams provide minimal player info: specialism, sold_price, player_status
-                        specialism = getattr(p, 'specialism', None)
-                        sold_price = getattr(p, 'sold_price', None)
-                        player_status = getattr(p, 'player_status', None)
-                        ipl_matches = getattr(p, 'ipl_matches', None)
-                        other_short.append({
-                            "name": name,
-                            "specialism": specialism,
-                            "sold_price": sold_price,
-                            "player_status": player_status,
-                            "ipl_matches": ipl_matches,
-                        })
-                    other_team_compositions += f"{t}: {json.dumps(other_short, ensure_ascii=False)}\n"
-                    other_team_budgets += f"{t}: {state.get(f'{t}_Budget', 0.0)}\n"
-
-            current_set_abbr = state.get('CurrentSet')
-            current_set_name = get_set_name(current_set_abbr) if current_set_abbr else "N/A"
-            remaining_sets_list = state.get('RemainingSets', [])
-            remaining_sets_full_names = get_set_name(remaining_sets_list)
-            remaining_sets_str = ", ".join(remaining_sets_full_names) if remaining_sets_full_names else "None"
-
-            # Format remaining players in set more cleanly
-            remaining_players_list = state.get('RemainingPlayersInSet', [])
-            remaining_in_set_players = ", ".join([f"{p.name} ({p.specialism})" for p in remaining_players_list]) if remaining_players_list else "None"
-
-            # Format other teams' bid history for this player
-            other_teams_intentions = ""
-            for t in teams:
-                if t != team_id and t in current_player.team_bid_history:
-                    history = current_player.team_bid_history[t]
-                    if history:
-                        other_teams_intentions += f"\n{t}'s bidding history:\n"
-                        for entry in history:
-                            decision_type = entry.get('decision', 'unknown')
-                            reason = entry.get('reason', 'No reason provided')
-                            round_num = entry.get('round', 0)
-                            price = entry.get('current_price', 0)
-                            if decision_type == "raise":
-                                is_normal = entry.get('is_normal', True)
-                                raised_amt = entry.get('raised_amount', 0)
-                                raise_info = "Normal raise" if is_normal else f"Custom raise (+{raised_amt} Cr)"
-                                other_teams_intentions += f"  Round {round_num} (at {price} Cr): {raise_info} - {reason}\n"
-                            else:
-                                other_teams_intentions += f"  Round {round_num} (at {price} Cr): PASSED - {reason}\n"
-            
-            if not other_teams_intentions:
-                other_teams_intentions = "First bidding opportunity - No other teams have bid yet. You have a strategic advantage to set the value for this player."
-
-            # Format this team's own bid history for this player
-            own_bid_history = ""
-            if team_id in current_player.team_bid_history:
-                history = current_player.team_bid_history[team_id]
-                if history:
-                    own_bid_history = f"Your team's bidding history for this player:\n"
-                    for entry in history:
-                        decision_type = entry.get('decision', 'unknown')
-                        reason = entry.get('reason', 'No reason provided')
-                        round_num = entry.get('round', 0)
-                        price = entry.get('current_price', 0)
-                        if decision_type == "raise":
-                            is_normal = entry.get('is_normal', True)
-                            raised_amt = entry.get('raised_amount', 0)
-                            raise_info = "Normal raise" if is_normal else f"Custom raise (+{raised_amt} Cr)"
-                            own_bid_history += f"  Round {round_num} (at {price} Cr): {raise_info} - {reason}\n"
-                        else:
-                            own_bid_history += f"  Round {round_num} (at {price} Cr): PASSED - {reason}\n"
-                else:
-                    own_bid_history = "This is your first opportunity to bid on this player. You can set your bidding strategy from the start."
-            else:
-                own_bid_history = "This is your first opportunity to bid on this player. You can set your bidding strategy from the start."
-
-            # Use static system prompt (no player-specific substitutions) per best practices
-            sys_prompt = prompts[f'{team_id}_sys']
-
-            # Prepare human prompt with player-specific substitutions only
-            human_template_raw = prompts[f'{team_id}_human']
-            human_prompt_template = string.Template(human_template_raw)
-            reserve_price_cr = current_player.reserve_price_lakh / 100
-            human_subs = {
-                'player_name': current_player.name,
-                'specialism': current_player.specialism,
-                'batting_style': current_player.batting_style,
-                'bowling_style': current_player.bowling_style,
-                'test_caps': current_player.test_caps,
-                'odi_caps': current_player.odi_caps,
-                't20_caps': current_player.t20_caps,
-                'ipl_matches': current_player.ipl_matches,
-                'player_status': current_player.player_status,
-                'reserve_price_lakh': current_player.reserve_price_lakh,
-                'reserve_price_cr': reserve_price_cr,
-                'current_price': current_price,
-                'min_bid_raise': min_bid_raise,
-                'next_bid_price': next_bid_price,
-                'team_composition': json.dumps(squad_short, ensure_ascii=False),
-                'slots_filled': len(squad),
-                'slots_remaining': 25 - len(squad),
-                'budget': budget,
-                'other_team_compositions': other_team_compositions,
-                'other_team_budgets': other_team_budgets,
-                'current_set': current_set_name,
-                'remaining_sets': remaining_sets_str,
-                'remaining_in_set_players': remaining_in_set_players,
-                'other_teams_intentions': other_teams_intentions,
-                'own_bid_history': own_bid_history
-            }
-            if '${player_stats}' in human_template_raw:
-                human_subs['player_stats'] = player_stats
-            human_msg = human_prompt_template.substitute(human_subs)
-            messages = [SystemMessage(content=sys_prompt), HumanMessage(content=human_msg)]
-            
-            bid_decision = llm.invoke(messages)
-            message_lines.append(f"  {team_id}: Received response from model. Response: {bid_decision}")
-            
+        if isinstance(bid_decision, Exception):
+            message_lines.append(f"  {team_id}: Error (API key #{api_key_id}) - {bid_decision!r}")
+            _log_team_error(team_id, bid_decision)
+            continue
+
+        try:
+            if DEBUG:
+                message_lines.append(f"  {team_id}: Received response from model. Response: {bid_decision}")
+
             if bid_decision:
-                message = AIMessage(content=str(bid_decision))
-                state["Messages"] = [message]
-
-                # Validate bid decision
-                is_raise = bool(getattr(bid_decision, 'is_raise', False))
-                is_normal = bool(getattr(bid_decision, 'is_normal', True))
-                raised_amount = float(getattr(bid_decision, 'raised_amount', 0.0) or 0.0)
-
-                # For custom raises, validate against minimum (except first bid where min is 0)
-                if is_raise and (not is_normal) and min_bid_raise > 0:
-                    if raised_amount < min_bid_raise:
-                        if team_id not in current_player.team_bid_history:
-                            current_player.team_bid_history[team_id] = []
-                        bid_history_entry = {
-                            "round": state.get('Round', 0),
-                            "reason": f"Custom raise {raised_amount} below minimum required {min_bid_raise}",
-                            "decision": "pass",
-                            "is_normal": None,
-                            "raised_amount": None,
-                            "current_price": current_price
-                        }
-                        current_player.team_bid_history[team_id].append(bid_history_entry)
-                        message_lines.append(f"  {team_id}: PASS - Custom raise {raised_amount} < required INR {min_bid_raise:.2f}")
-                        continue
+                # Validate bid decision (fields are strictly typed by BidderInput)
+                is_raise = bid_decision.is_raise
+                is_normal = bid_decision.is_normal
+                raised_amount = bid_decision.raised_amount
+
+                # For custom raises, validate against minimum (zero for the first bid)
+                if not is_valid_raise(is_raise, is_normal, raised_amount, min_bid_raise):
+                    if team_id not in current_player.team_bid_history:
+                        current_player.team_bid_history[team_id] = []
+                    bid_history_entry = BidHistoryEntry(
+                        round=state.get('Round', 0),
+                        decision="pass",
+                        reason=f"Custom raise {raised_amount} below minimum required {min_bid_raise}",
+                        current_price=current_price
+                    )
+                    current_player.team_bid_history[team_id].append(bid_history_entry)
+                    message_lines.append(f"  {team_id}: PASS - Custom raise {raised_amount} < required INR {min_bid_raise:.2f}")
+                    continue
 
                 # Store this team's bid decision in the player's history
                 if team_id not in current_player.team_bid_history:
                     current_player.team_bid_history[team_id] = []
 
-                bid_history_entry = {
-                    "round": state.get('Round', 0),
-                    "reason": bid_decision.reason,
-                    "decision": "raise" if is_raise else "pass",
-                    "is_normal": bid_decision.is_normal if is_raise else None,
-                    "raised_amount": bid_decision.raised_amount if is_raise else None,
-                    "current_price": current_price
-                }
+                bid_history_entry = BidHistoryEntry(
+                    round=state.get('Round', 0),
+                    decision="raise" if is_raise else "pass",
+                    reason=bid_decision.reason,
+                    current_price=current_price,
+                    is_normal=bid_decision.is_normal if is_raise else None,
+                    raised_amount=bid_decision.raised_amount if is_raise else None
+                )
                 current_player.team_bid_history[team_id].append(bid_history_entry)
 
                 if is_raise:
@@ -320,27 +677,27 @@ def agent_pool(state: AgentState) -> AgentState:
                     raise_type = "Normal" if bid_decision.is_normal else f"Custom (+{bid_decision.raised_amount})"
                     message_lines.append(f"  {team_id}: BID ({raise_type}) - Reason: {bid_decision.reason}")
                     message_lines.append(f"\n  FIRST BID FOUND! Passing to trade master...")
-                    message_lines.append("="*60)
-                    print("[AGENT_POOL] Message:\n" + "\n".join(message_lines), flush=True)
-                    state["Messages"] = [AIMessage(content="\n".join(message_lines))]
-                    return state  # Return immediately with first bid
+                    message_lines.append(_BANNER)
+                    _publish(state, message_lines)
+                    return state  # Return immediately with first bid; later responses are discarded
                 else:
                     message_lines.append(f"  {team_id}: PASS - Reason: {bid_decision.reason}")
             else:
                 message_lines.append(f"  {team_id}: PASS (Could not parse bid decision) - Reason: {str(bid_decision)}")
-                
+
         except Exception as e:
-            try:
-                key_info = f" (API key #{api_key_id})"
-            except Exception:
-                key_info = ""
-            message_lines.append(f"  {team_id}: Error{key_info} - {str(e)}")
+            message_lines.append(f"  {team_id}: Error (API key #{api_key_id}) - {e!r}")
+            _log_team_error(team_id, e)
 
-    # --- End of greedy sequential execution ---
+    # --- End of concurrent greedy execution ---
     # All teams passed
     message_lines.append(f"\n  All eligible teams passed. No bids found.")
-    message_lines.append("="*60)
-    print("[AGENT_POOL] Message:\n" + "\n".join(message_lines), flush=True)
+    message_lines.append(_BANNER)
     state["OtherTeamBidding"] = None  # Clear any previous bids
-    state["Messages"] = [AIMessage(content="\n".join(message_lines))]
+    _publish(state, message_lines)
     return state
+
+
+def agent_pool(state: AgentState) -> AgentState:
+    """Synchronous agent pool node (graph.invoke / graph.stream): runs agent_pool_async on the module's event loop."""
+    return _run_async(agent_pool_async(state))
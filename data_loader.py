@@ -1,103 +1,206 @@
 from typing import Literal, Dict, List
-from utils import AgentState, Player, AIMessage
+from utils import AgentState, Player, BidHistoryEntry, LazyStats, AIMessage, TEAMS, DEBUG
 import csv
+from collections import defaultdict
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
 import os
+import pickle
+import sys
 
-def load_player_data() -> Dict[Literal['M1', 'M2', 'AL1', 'AL2', 'AL3', 'AL4', 'AL5', 'AL6', 'AL7', 'AL8', 'AL9', 'AL10', 'BA1', 'BA2', 'BA3', 'BA4', 'BA5', 'FA1', 'FA2', 'FA3', 'FA4', 'FA5', 'FA6', 'FA7', 'FA8', 'FA9', 'FA10', 'SP1', 'SP2', 'SP3', 'WK1', 'WK2', 'WK3', 'WK4', 'UAL1', 'UAL2', 'UAL3', 'UAL4', 'UAL5', 'UAL6', 'UAL7', 'UAL8', 'UAL9', 'UAL10', 'UAL11', 'UAL12', 'UAL13', 'UAL14', 'UAL15', 'UBA1', 'UBA2', 'UBA3', 'UBA4', 'UBA5', 'UBA6', 'UBA7', 'UBA8', 'UBA9', 'UFA1', 'UFA2', 'UFA3', 'UFA4', 'UFA5', 'UFA6', 'UFA7', 'UFA8', 'UFA9', 'UFA10', 'USP1', 'USP2', 'USP3', 'USP4', 'USP5', 'UWK1', 'UWK2', 'UWK3', 'UWK4', 'UWK5', 'UWK6'], List[Player]]:
+DB_DIR = os.path.join(os.path.dirname(__file__), "DB")
+STATS_DIR = os.path.join(DB_DIR, "stats")
+CACHE_DIR = os.path.join(DB_DIR, ".cache")
+PLAYERS_CSV = os.path.join(DB_DIR, "players.csv")
+RETAINED_CSV = os.path.join(DB_DIR, "retained_players.csv")
+SET_ORDER_CSV = os.path.join(DB_DIR, "orderOfSets.csv")
+TEAMS_PURSE_CSV = os.path.join(DB_DIR, "teams_purse.csv")
+# Bump whenever Player/BidHistoryEntry or the loaders change shape, so old caches are ignored
+AUCTION_CACHE_SCHEMA_VERSION = 4
+
+# All IPL 2025 auction sets, in default auction order
+ALL_SET_NAMES = (
+    # Marquee
+    'M1', 'M2',
+    # Capped Allrounders
+    'AL1', 'AL2', 'AL3', 'AL4', 'AL5', 'AL6', 'AL7', 'AL8', 'AL9', 'AL10',
+    # Capped Batters
+    'BA1', 'BA2', 'BA3', 'BA4', 'BA5',
+    # Capped Fast Bowlers
+    'FA1', 'FA2', 'FA3', 'FA4', 'FA5', 'FA6', 'FA7', 'FA8', 'FA9', 'FA10',
+    # Capped Spinners
+    'SP1', 'SP2', 'SP3',
+    # Capped Wicketkeepers
+    'WK1', 'WK2', 'WK3', 'WK4',
+    # Uncapped Allrounders
+    'UAL1', 'UAL2', 'UAL3', 'UAL4', 'UAL5', 'UAL6', 'UAL7', 'UAL8', 'UAL9', 'UAL10',
+    'UAL11', 'UAL12', 'UAL13', 'UAL14', 'UAL15',
+    # Uncapped Batters
+    'UBA1', 'UBA2', 'UBA3', 'UBA4', 'UBA5', 'UBA6', 'UBA7', 'UBA8', 'UBA9',
+    # Uncapped Fast Bowlers
+    'UFA1', 'UFA2', 'UFA3', 'UFA4', 'UFA5', 'UFA6', 'UFA7', 'UFA8', 'UFA9', 'UFA10',
+    # Uncapped Spinners
+    'USP1', 'USP2', 'USP3', 'USP4', 'USP5',
+    # Uncapped Wicketkeepers
+    'UWK1', 'UWK2', 'UWK3', 'UWK4', 'UWK5', 'UWK6',
+)
+
+# Loaders that took their fallback path (defaults or an empty result after an error) since
+# load_auction_data_cached last reset it; their output is never written to the snapshot
+_LOAD_FALLBACKS = set()
+
+def _open_csv(csv_path: str) -> io.StringIO:
+    """Read a CSV file with one read() call and return it as an in-memory text stream.
+    
+    The DB CSVs are tens of KB, so decoding the whole file once is cheaper than
+    driving csv through the buffered text layer.
+    """
+    with open(csv_path, 'rb') as f:
+        data = f.read()
+    return io.StringIO(data.decode('utf-8'), newline='')
+
+def _parse_serial_no(value: str) -> int:
+    """Return a Serial_No cell as an int, or 0 when it is empty or malformed."""
+    try:
+        return int(float(value)) if value else 0
+    except ValueError:
+        return 0
+
+def _to_int(value) -> int:
+    """Parse a numeric CSV cell such as "12" or "12.0" as an int; empty or missing is 0."""
+    return int(float(value)) if value else 0
+
+def _to_float(value) -> float:
+    """Parse a numeric CSV cell as a float; empty or missing is 0.0."""
+    return float(value) if value else 0.0
+
+def _numeric_column(values, convert) -> list:
+    """Convert a whole column of numeric cells, mapping unparseable cells to None.
+    
+    The common all-valid case is a single map() over the column; only a column
+    containing a bad cell falls back to converting cell by cell.
+    """
+    try:
+        return list(map(convert, values))
+    except ValueError:
+        converted = []
+        for value in values:
+            try:
+                converted.append(convert(value))
+            except ValueError:
+                converted.append(None)
+        return converted
+
+def _stats_paths(serial_nos: List[int]) -> Dict[int, str]:
+    """Map each serial number that has a stats file to that file's path.
+    
+    The stats directory is listed once into a set of serial numbers, so each
+    lookup is a set membership test instead of an os.path.exists probe.
+    Serials without a stats file (including 0 for a missing Serial_No) are
+    omitted.
+    """
+    try:
+        with os.scandir(STATS_DIR) as entries:
+            available = {
+                int(entry.name[:-4]) for entry in entries
+                if entry.name.endswith(".txt") and entry.name[:-4].isdigit() and entry.is_file()
+            }
+    except OSError:
+        return {}
+    
+    return {serial_no: f"{STATS_DIR}{os.sep}{serial_no}.txt" for serial_no in serial_nos if serial_no > 0 and serial_no in available}
+
+def load_player_data() -> Dict[str, List[Player]]:
     """Load player data from CSV file in DB folder, grouped by set.
     Returns:
         Dictionary mapping set names (e.g., 'M1', 'M2', 'AL1') to list of players in that set.
     """
     
     # Initialize empty lists for all IPL 2025 auction sets
-    players_by_set = {
-        # Marquee
-        'M1': [], 'M2': [],
-        # Capped Allrounders
-        'AL1': [], 'AL2': [], 'AL3': [], 'AL4': [], 'AL5': [], 'AL6': [], 'AL7': [], 'AL8': [], 'AL9': [], 'AL10': [],
-        # Capped Batters
-        'BA1': [], 'BA2': [], 'BA3': [], 'BA4': [], 'BA5': [],
-        # Capped Fast Bowlers
-        'FA1': [], 'FA2': [], 'FA3': [], 'FA4': [], 'FA5': [], 'FA6': [], 'FA7': [], 'FA8': [], 'FA9': [], 'FA10': [],
-        # Capped Spinners
-        'SP1': [], 'SP2': [], 'SP3': [],
-        # Capped Wicketkeepers
-        'WK1': [], 'WK2': [], 'WK3': [], 'WK4': [],
-        # Uncapped Allrounders
-        'UAL1': [], 'UAL2': [], 'UAL3': [], 'UAL4': [], 'UAL5': [], 'UAL6': [], 'UAL7': [], 'UAL8': [], 'UAL9': [], 'UAL10': [],
-        'UAL11': [], 'UAL12': [], 'UAL13': [], 'UAL14': [], 'UAL15': [],
-        # Uncapped Batters
-        'UBA1': [], 'UBA2': [], 'UBA3': [], 'UBA4': [], 'UBA5': [], 'UBA6': [], 'UBA7': [], 'UBA8': [], 'UBA9': [],
-        # Uncapped Fast Bowlers
-        'UFA1': [], 'UFA2': [], 'UFA3': [], 'UFA4': [], 'UFA5': [], 'UFA6': [], 'UFA7': [], 'UFA8': [], 'UFA9': [], 'UFA10': [],
-        # Uncapped Spinners
-        'USP1': [], 'USP2': [], 'USP3': [], 'USP4': [], 'USP5': [],
-        # Uncapped Wicketkeepers
-        'UWK1': [], 'UWK2': [], 'UWK3': [], 'UWK4': [], 'UWK5': [], 'UWK6': [],
-    }
-    csv_path = os.path.join(os.path.dirname(__file__), "DB", "players.csv")
+    players_by_set = defaultdict(list, {set_name: [] for set_name in ALL_SET_NAMES})
+    csv_path = PLAYERS_CSV
     
     try:
-        with open(csv_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            row_count = 0
-            for row in reader:
-                row_count += 1
-                try:
-                    serial_no = int(float(row['Serial_No'])) if 'Serial_No' in row and row['Serial_No'] else 0
-                    
-                    # Load stats from stats folder based on serial number
-                    stats_content = ""
-                    if serial_no > 0:
-                        stats_file = os.path.join(os.path.dirname(__file__), "DB", "stats", f"{serial_no}.txt")
-                        if os.path.exists(stats_file):
-                            try:
-                                with open(stats_file, 'r', encoding='utf-8', errors='ignore') as f:
-                                    stats_content = f.read()
-                            except Exception:
-                                # Fallback to binary read if UTF-8 fails
-                                try:
-                                    with open(stats_file, 'rb') as fb:
-                                        stats_content = fb.read().decode('utf-8', errors='ignore')
-                                except Exception:
-                                    stats_content = "Stats file could not be read."
-                    
-                    player = Player(
-                        name=row['Name'],
-                        specialism=row['Specialism'],
-                        batting_style=row['Batting_Style'],
-                        bowling_style=row['Bowling_Style'],
-                        test_caps=int(float(row['Test_Caps'])) if row['Test_Caps'] else 0,
-                        odi_caps=int(float(row['ODI_Caps'])) if row['ODI_Caps'] else 0,
-                        t20_caps=int(float(row['T20_Caps'])) if row['T20_Caps'] else 0,
-                        ipl_matches=int(float(row['IPL_Matches'])) if row['IPL_Matches'] else 0,
-                        player_status=row['Player_Status'],
-                        reserve_price_lakh=float(row['Reserve_Price_Lakh']) if row['Reserve_Price_Lakh'] else 0.0,
-                        set=row['Set'],
-                        stats=stats_content,
-                        status=False,
-                        sold_price=0.0
-                    )
-                    
-                    # Group players by set
-                    player_set = row['Set']
-                    if player_set not in players_by_set:
-                        players_by_set[player_set] = []
-                    players_by_set[player_set].append(player)
-                except Exception as e:
-                    print(f"Error loading player row {row_count} ({row.get('Name', 'unknown')}): {e}")
-                    continue
+        with _open_csv(csv_path) as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            rows = list(reader)
+        
+        # Positional column indexes, resolved once from the header
+        col = {name: i for i, name in enumerate(header)}
+        serial_col = col.get('Serial_No')
+        name_col, specialism_col, set_col = col['Name'], col['Specialism'], col['Set']
+        batting_col, bowling_col, status_col = col['Batting_Style'], col['Bowling_Style'], col['Player_Status']
+        test_col, odi_col, t20_col, ipl_col = col['Test_Caps'], col['ODI_Caps'], col['T20_Caps'], col['IPL_Matches']
+        reserve_col = col['Reserve_Price_Lakh']
+        
+        # Keep complete rows; blank lines are skipped silently as csv.DictReader did
+        width = len(header)
+        row_numbers, complete_rows = [], []
+        for row_count, row in enumerate(rows, 1):
+            if len(row) >= width:
+                row_numbers.append(row_count)
+                complete_rows.append(row)
+            elif any(row):
+                print(f"Error loading player row {row_count} ({row[name_col] if name_col < len(row) else 'unknown'}): expected {width} columns, got {len(row)}")
+        
+        # Columnar parse: transpose once and convert each numeric column in one map() pass
+        columns = list(zip(*complete_rows)) if complete_rows else [()] * width
+        serial_nos = list(map(_parse_serial_no, columns[serial_col])) if serial_col is not None else [0] * len(complete_rows)
+        numeric_columns = zip(
+            _numeric_column(columns[test_col], _to_int),
+            _numeric_column(columns[odi_col], _to_int),
+            _numeric_column(columns[t20_col], _to_int),
+            _numeric_column(columns[ipl_col], _to_int),
+            _numeric_column(columns[reserve_col], _to_float),
+        )
+        
+        # Resolve stats files up front; their contents are read lazily on first use
+        stats_paths = _stats_paths(serial_nos)
+        
+        # Categorical columns repeat a handful of values; share one str object per value
+        intern = sys.intern
+        for row_count, row, serial_no, numbers in zip(row_numbers, complete_rows, serial_nos, numeric_columns):
+            if None in numbers:
+                print(f"Error loading player row {row_count} ({row[name_col]}): invalid numeric value")
+                continue
+            test_caps, odi_caps, t20_caps, ipl_matches, reserve_price_lakh = numbers
+            stats_path = stats_paths.get(serial_no)
+            
+            player = Player(
+                name=row[name_col],
+                specialism=intern(row[specialism_col]),
+                batting_style=intern(row[batting_col]),
+                bowling_style=intern(row[bowling_col]),
+                test_caps=test_caps,
+                odi_caps=odi_caps,
+                t20_caps=t20_caps,
+                ipl_matches=ipl_matches,
+                player_status=intern(row[status_col]),
+                reserve_price_lakh=reserve_price_lakh,
+                set=intern(row[set_col]),
+                stats=LazyStats(stats_path) if stats_path else "",
+                status=False,
+                sold_price=0.0
+            )
+            
+            # Group players by set; unknown sets get a list on first use
+            players_by_set[player.set].append(player)
+        
+        # Count loaded players
+        total_players = sum(len(players) for players in players_by_set.values())
+        print(f"[DATA_LOADER] Loaded {total_players} players across {len([s for s, p in players_by_set.items() if p])} sets")
             
-            # Count loaded players
-            total_players = sum(len(players) for players in players_by_set.values())
-            print(f"[DATA_LOADER] Loaded {total_players} players across {len([s for s, p in players_by_set.items() if p])} sets")
-                
     except FileNotFoundError:
         print(f"Error: CSV file not found at {csv_path}")
+        _LOAD_FALLBACKS.add('players')
     except Exception as e:
         print(f"Error loading player data: {e}")
+        _LOAD_FALLBACKS.add('players')
     
-    return players_by_set
+    # Hand back a plain dict so later lookups of unknown sets don't create entries
+    return dict(players_by_set)
 
 def load_retained_players() -> Dict[Literal['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', 'PBKS', 'RR', 'RCB', 'SRH'], List[Player]]:
     """Load retained players from retained_players.csv and assign them to teams.
@@ -105,15 +208,12 @@ def load_retained_players() -> Dict[Literal['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI
     Returns:
         Dictionary mapping team names to list of retained players.
     """
-    retained_by_team = {
-        'CSK': [], 'DC': [], 'GT': [], 'KKR': [], 'LSG': [],
-        'MI': [], 'PBKS': [], 'RR': [], 'RCB': [], 'SRH': []
-    }
+    retained_by_team = {team: [] for team in TEAMS}
     
-    csv_path = os.path.join(os.path.dirname(__file__), "DB", "retained_players.csv")
+    csv_path = RETAINED_CSV
     
     try:
-        with open(csv_path, 'r', encoding='utf-8') as file:
+        with _open_csv(csv_path) as file:
             reader = csv.DictReader(file)
             for row in reader:
                 team = row['Team']
@@ -122,14 +222,14 @@ def load_retained_players() -> Dict[Literal['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI
                 # Create a Player object for retained player with full info from CSV
                 player = Player(
                     name=row['Players'],
-                    specialism=row['Specialism'],
-                    batting_style=row['Batting_Style'] if 'Batting_Style' in row else "",
-                    bowling_style=row['Bowling_Style'] if 'Bowling_Style' in row else "",
-                    test_caps=int(float(row['Test_Caps'])) if 'Test_Caps' in row and row['Test_Caps'] else 0,
-                    odi_caps=int(float(row['ODI_Caps'])) if 'ODI_Caps' in row and row['ODI_Caps'] else 0,
-                    t20_caps=int(float(row['T20_Caps'])) if 'T20_Caps' in row and row['T20_Caps'] else 0,
-                    ipl_matches=int(float(row['IPL_Matches'])) if 'IPL_Matches' in row and row['IPL_Matches'] else 0,
-                    player_status=row['Player_Status'] if 'Player_Status' in row else "Retained",
+                    specialism=sys.intern(row['Specialism']),
+                    batting_style=sys.intern(row.get('Batting_Style', "")),
+                    bowling_style=sys.intern(row.get('Bowling_Style', "")),
+                    test_caps=_to_int(row.get('Test_Caps')),
+                    odi_caps=_to_int(row.get('ODI_Caps')),
+                    t20_caps=_to_int(row.get('T20_Caps')),
+                    ipl_matches=_to_int(row.get('IPL_Matches')),
+                    player_status=sys.intern(row.get('Player_Status', "Retained")),
                     reserve_price_lakh=0.0,
                     set="Retained",
                     stats=row['Reason_for_Retention'] if 'Reason_for_Retention' in row else "",
@@ -138,12 +238,12 @@ def load_retained_players() -> Dict[Literal['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI
                     sold_team=team,
                     reason_for_purchase=row['Reason_for_Retention'] if 'Reason_for_Retention' in row else "Retained",
                     team_bid_history={
-                        team: [{
-                            'round': 0,
-                            'decision': 'Retained',
-                            'reason': row['Reason_for_Retention'] if 'Reason_for_Retention' in row else "Retained",
-                            'amount': sold_price
-                        }]
+                        team: [BidHistoryEntry(
+                            round=0,
+                            decision='Retained',
+                            reason=row['Reason_for_Retention'] if 'Reason_for_Retention' in row else "Retained",
+                            current_price=sold_price
+                        )]
                     }
                 )
                 
@@ -152,15 +252,17 @@ def load_retained_players() -> Dict[Literal['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI
     
     except FileNotFoundError:
         print(f"Error: Retained players CSV file not found at {csv_path}")
+        _LOAD_FALLBACKS.add('retained players')
     except Exception as e:
         print(f"Error loading retained players: {e}")
+        _LOAD_FALLBACKS.add('retained players')
     
     return retained_by_team
 
 def load_set_order() -> List[str]:
     """Load the order of sets from orderOfSets.csv."""
     set_order = []
-    csv_path = os.path.join(os.path.dirname(__file__), "DB", "orderOfSets.csv")
+    csv_path = SET_ORDER_CSV
     try:
         with open(csv_path, 'r', encoding='utf-8') as file:
             reader = csv.DictReader(file)
@@ -174,25 +276,13 @@ def load_set_order() -> List[str]:
         # If no sets were loaded, use fallback
         if not set_order:
             print(f"[DATA_LOADER] Warning: No sets loaded from CSV, using fallback order")
-            set_order = ['M1', 'M2', 'AL1', 'AL2', 'AL3', 'AL4', 'AL5', 'AL6', 'AL7', 'AL8', 'AL9', 'AL10', 
-                        'BA1', 'BA2', 'BA3', 'BA4', 'BA5', 'FA1', 'FA2', 'FA3', 'FA4', 'FA5', 'FA6', 'FA7', 'FA8', 'FA9', 'FA10',
-                        'SP1', 'SP2', 'SP3', 'WK1', 'WK2', 'WK3', 'WK4',
-                        'UAL1', 'UAL2', 'UAL3', 'UAL4', 'UAL5', 'UAL6', 'UAL7', 'UAL8', 'UAL9', 'UAL10', 'UAL11', 'UAL12', 'UAL13', 'UAL14', 'UAL15',
-                        'UBA1', 'UBA2', 'UBA3', 'UBA4', 'UBA5', 'UBA6', 'UBA7', 'UBA8', 'UBA9',
-                        'UFA1', 'UFA2', 'UFA3', 'UFA4', 'UFA5', 'UFA6', 'UFA7', 'UFA8', 'UFA9', 'UFA10',
-                        'USP1', 'USP2', 'USP3', 'USP4', 'USP5',
-                        'UWK1', 'UWK2', 'UWK3', 'UWK4', 'UWK5', 'UWK6']
+            set_order = list(ALL_SET_NAMES)
+            _LOAD_FALLBACKS.add('set order')
     except Exception as e:
         print(f"[DATA_LOADER] Error loading set order: {e}")
         # Fallback to a default order if file not found
-        set_order = ['M1', 'M2', 'AL1', 'AL2', 'AL3', 'AL4', 'AL5', 'AL6', 'AL7', 'AL8', 'AL9', 'AL10', 
-                    'BA1', 'BA2', 'BA3', 'BA4', 'BA5', 'FA1', 'FA2', 'FA3', 'FA4', 'FA5', 'FA6', 'FA7', 'FA8', 'FA9', 'FA10',
-                    'SP1', 'SP2', 'SP3', 'WK1', 'WK2', 'WK3', 'WK4',
-                    'UAL1', 'UAL2', 'UAL3', 'UAL4', 'UAL5', 'UAL6', 'UAL7', 'UAL8', 'UAL9', 'UAL10', 'UAL11', 'UAL12', 'UAL13', 'UAL14', 'UAL15',
-                    'UBA1', 'UBA2', 'UBA3', 'UBA4', 'UBA5', 'UBA6', 'UBA7', 'UBA8', 'UBA9',
-                    'UFA1', 'UFA2', 'UFA3', 'UFA4', 'UFA5', 'UFA6', 'UFA7', 'UFA8', 'UFA9', 'UFA10',
-                    'USP1', 'USP2', 'USP3', 'USP4', 'USP5',
-                    'UWK1', 'UWK2', 'UWK3', 'UWK4', 'UWK5', 'UWK6']
+        set_order = list(ALL_SET_NAMES)
+        _LOAD_FALLBACKS.add('set order')
     
     print(f"[DATA_LOADER] Loaded set order with {len(set_order)} sets")
     return set_order
@@ -200,7 +290,7 @@ def load_set_order() -> List[str]:
 def load_team_budgets() -> Dict[Literal['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', 'PBKS', 'RR', 'RCB', 'SRH'], float]:
     """Load team budgets from teams_purse.csv."""
     team_budgets = {}
-    csv_path = os.path.join(os.path.dirname(__file__), "DB", "teams_purse.csv")
+    csv_path = TEAMS_PURSE_CSV
     
     try:
         with open(csv_path, 'r', encoding='utf-8') as file:
@@ -211,8 +301,9 @@ def load_team_budgets() -> Dict[Literal['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', '
                 team_budgets[team] = available
         
         print(f"[DATA_LOADER] Loaded budgets for {len(team_budgets)} teams from teams_purse.csv")
-        for team, budget in team_budgets.items():
-            print(f"[DATA_LOADER] {team}: {budget:.2f} Cr available")
+        if DEBUG:
+            for team, budget in team_budgets.items():
+                print(f"[DATA_LOADER] {team}: {budget:.2f} Cr available")
     
     except Exception as e:
         print(f"[DATA_LOADER] Error loading team budgets: {e}")
@@ -222,24 +313,120 @@ def load_team_budgets() -> Dict[Literal['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', '
             'CSK': 125.0, 'DC': 125.0, 'GT': 125.0, 'KKR': 125.0, 'LSG': 125.0,
             'MI': 125.0, 'PBKS': 125.0, 'RR': 125.0, 'RCB': 125.0, 'SRH': 125.0
         }
+        _LOAD_FALLBACKS.add('team budgets')
     
     return team_budgets
 
-def initialize_auction(state: AgentState) -> AgentState:
-    """Initialize auction state by loading all player data and retained players."""
+def prefetch_stats(players: List[Player]) -> None:
+    """Read the pending LazyStats of the given players concurrently.
+    
+    Stats files are small, so the cost is per-file latency; overlapping the
+    reads in a thread pool hides most of it. Player objects are untouched
+    apart from each LazyStats caching its file bytes.
+    """
+    pending = [p.stats for p in players if isinstance(p.stats, LazyStats)]
+    if not pending:
+        return
+    with ThreadPoolExecutor(max_workers=min(32, len(pending))) as executor:
+        for _ in executor.map(LazyStats.raw, pending):
+            pass
+
+def _auction_cache_key() -> str:
+    """Hash the DB CSVs and the stats directory listing into a cache key."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"schema={AUCTION_CACHE_SCHEMA_VERSION}".encode())
+    for csv_path in (PLAYERS_CSV, RETAINED_CSV, SET_ORDER_CSV, TEAMS_PURSE_CSV):
+        with open(csv_path, 'rb') as f:
+            h.update(f.read())
+    with os.scandir(STATS_DIR) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            st = entry.stat()
+            h.update(f"{entry.name}:{st.st_mtime_ns}:{st.st_size};".encode())
+    return h.hexdigest()
+
+# In-process memo of the last snapshot: (cache_key, pickled bytes)
+_SNAPSHOT = None
+
+def load_auction_data_cached() -> dict:
+    """Load everything initialize_auction needs, reusing a snapshot when the DB is unchanged.
     
-    print("[DATA_LOADER] Loading player data from CSV...")
-    players_by_set = load_player_data()
+    Returns a dict with players_by_set, retained_by_team, set_order and
+    team_budgets. The snapshot is a pickle in DB/.cache/{key}.pkl, keyed by the
+    contents of the four DB CSVs and the DB/stats listing (names, sizes,
+    mtimes), and is also memoized in-process. Every call returns fresh objects,
+    since the auction mutates them. Any problem with the snapshot falls back to
+    parsing the CSVs. If a loader had to fall back to defaults, the result is
+    returned but not snapshotted, so the next start parses the CSVs again.
+    """
+    global _SNAPSHOT
+    try:
+        cache_key = _auction_cache_key()
+    except OSError:
+        cache_key = None
     
-    print("[DATA_LOADER] Loading set order from CSV...")
-    set_order = load_set_order()
+    if cache_key:
+        cache_path = os.path.join(CACHE_DIR, f"{cache_key}.pkl")
+        try:
+            if _SNAPSHOT is not None and _SNAPSHOT[0] == cache_key:
+                blob = _SNAPSHOT[1]
+            else:
+                with open(cache_path, 'rb') as f:
+                    blob = f.read()
+            payload = pickle.loads(blob)
+            if payload.get('schema_version') == AUCTION_CACHE_SCHEMA_VERSION:
+                _SNAPSHOT = (cache_key, blob)
+                total_players = sum(len(players) for players in payload['players_by_set'].values())
+                print(f"[DATA_LOADER] Loaded {total_players} players, retentions, set order and budgets from cache {cache_key[:8]}")
+                return payload
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[DATA_LOADER] Ignoring unreadable auction cache: {e}")
     
-    print("[DATA_LOADER] Loading retained players...")
-    retained_by_team = load_retained_players()
+    _LOAD_FALLBACKS.clear()
+    payload = {
+        'schema_version': AUCTION_CACHE_SCHEMA_VERSION,
+        'players_by_set': load_player_data(),
+        'retained_by_team': load_retained_players(),
+        'set_order': load_set_order(),
+        'team_budgets': load_team_budgets(),
+    }
+    
+    if _LOAD_FALLBACKS:
+        print(f"[DATA_LOADER] Not caching auction data: fell back to defaults for {', '.join(sorted(_LOAD_FALLBACKS))}")
+    elif cache_key and any(payload['players_by_set'].values()):
+        try:
+            # Pickling materializes every LazyStats; read them concurrently first
+            prefetch_stats([p for players in payload['players_by_set'].values() for p in players])
+            blob = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+            _SNAPSHOT = (cache_key, blob)
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, cache_path)
+            # Drop snapshots of older versions of the DB
+            for entry in os.scandir(CACHE_DIR):
+                if entry.name.endswith(".pkl") and entry.name != f"{cache_key}.pkl":
+                    os.remove(entry.path)
+        except OSError as e:
+            print(f"[DATA_LOADER] Could not write auction cache: {e}")
+    
+    return payload
+
+def initialize_auction(state: AgentState) -> AgentState:
+    """Initialize auction state by loading all player data and retained players."""
+    
+    print("[DATA_LOADER] Loading player data, retained players, set order and team budgets...")
+    auction_data = load_auction_data_cached()
+    players_by_set = auction_data['players_by_set']
+    retained_by_team = auction_data['retained_by_team']
+    set_order = auction_data['set_order']
     
     # Initialize state with base data
     state['RemainingPlayers'] = players_by_set
-    state['RemainingSets'] = set_order
+    # Only sets that actually have players; host_assistant relies on this
+    state['RemainingSets'] = [s for s in set_order if players_by_set.get(s)]
     state['CurrentSet'] = None
     state['RemainingPlayersInSet'] = None
     state['AuctionStatus'] = False
@@ -248,23 +435,22 @@ def initialize_auction(state: AgentState) -> AgentState:
     state['OtherTeamBidding'] = None
     state['Round'] = 0
     
-    # Assign retained players to teams
-    for team in ['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', 'PBKS', 'RR', 'RCB', 'SRH']:
-        state[team] = retained_by_team[team]
-        retained_count = len(retained_by_team[team])
-        retained_cost = sum(p.sold_price for p in retained_by_team[team])
-        print(f"[DATA_LOADER] {team}: {retained_count} retained players, {retained_cost:.2f} Cr spent")
-    
     state['UnsoldPlayers'] = []
     
-    # Now load team budgets (which already account for retentions)
-    print("[DATA_LOADER] Loading team budgets from teams_purse.csv...")
-    team_budgets = load_team_budgets()
-    
-    for team in ['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', 'PBKS', 'RR', 'RCB', 'SRH']:
+    # Assign retained players and budgets in one pass; team budgets from
+    # teams_purse.csv already account for retentions
+    team_budgets = auction_data['team_budgets']
+    for team in TEAMS:
+        retained = retained_by_team[team]
         available_budget = team_budgets.get(team, 125.0)
+        state[team] = retained
         state[f"{team}_Budget"] = available_budget
-        print(f"[DATA_LOADER] {team}: {available_budget:.2f} Cr available after retentions")
+        if DEBUG:
+            retained_cost = sum(p.sold_price for p in retained)
+            print(f"[DATA_LOADER] {team}: {len(retained)} retained players, {retained_cost:.2f} Cr spent, {available_budget:.2f} Cr available after retentions")
+    
+    print(f"[DATA_LOADER] {len(TEAMS)} teams: {sum(len(r) for r in retained_by_team.values())} retained players, "
+          f"{sum(state[f'{team}_Budget'] for team in TEAMS):.2f} Cr available in total")
     
     state['Messages'] = [AIMessage(content="Auction initialized with player data, retained players, and team budgets loaded.")]
     
@@ -1,28 +1,51 @@
-from utils import AgentState, Player
-from typing import Literal
+from utils import AgentState, Player, DEBUG
+from typing import Callable, Literal
 
-def host(state: AgentState) -> Literal["host_assistant", "bidder_pool", "end"]:
-    """Host function to route to host_assistant, bidder_pool, or END."""
+def _route(state: AgentState) -> Literal["host_assistant", "bidder_pool", "end"]:
+    """Pick the next node for the current state."""
     if not state:
         raise ValueError("State cannot be None or empty.")
-    remaining_sets = state.get('RemainingSets') or []
-    remaining_in_set = state.get('RemainingPlayersInSet') or []
+    remaining_sets = state.get('RemainingSets')
+    remaining_in_set = state.get('RemainingPlayersInSet')
     current_player = state.get('CurrentPlayer')
     auction_status = state.get('AuctionStatus')
-    
-    print(f"[HOST] RemainingSets={len(remaining_sets)}, RemainingInSet={len(remaining_in_set)}, CurrentPlayer={getattr(current_player, 'name', None)}, AuctionStatus={auction_status}", flush=True)
+
+    if DEBUG:
+        print(f"[HOST] RemainingSets={len(remaining_sets or [])}, RemainingInSet={len(remaining_in_set or [])}, CurrentPlayer={getattr(current_player, 'name', None)}, AuctionStatus={auction_status}")
 
     # Route to end if all sets and players are done
     if not remaining_sets and not remaining_in_set and not current_player:
-        print(f"[HOST] Routing to end - auction complete", flush=True)
         return "end"
-    
+
     # Route to host_assistant if auction not started
     if not auction_status:
-        print(f"[HOST] Routing to host_assistant - starting new set/player", flush=True)
         return "host_assistant"
-    
+
     # Route to bidder_pool if auction is active
-    print(f"[HOST] Routing to bidder_pool - auction active", flush=True)
     return "bidder_pool"
 
+_ROUTE_MESSAGES = {
+    "end": "[HOST] Routing to end - auction complete",
+    "host_assistant": "[HOST] Routing to host_assistant - starting new set/player",
+    "bidder_pool": "[HOST] Routing to bidder_pool - auction active",
+}
+
+def make_host(verbose: bool = True) -> Callable[[AgentState], Literal["host_assistant", "bidder_pool", "end"]]:
+    """Build the host router.
+
+    Args:
+        verbose: Print the routing decision on every step. The choice is made
+            here once, so a quiet router carries no per-step logging checks.
+    """
+    if not verbose:
+        return _route
+
+    def host(state: AgentState) -> Literal["host_assistant", "bidder_pool", "end"]:
+        """Host function to route to host_assistant, bidder_pool, or END."""
+        next_node = _route(state)
+        print(_ROUTE_MESSAGES[next_node])
+        return next_node
+
+    return host
+
+host = make_host(verbose=DEBUG)
@@ -1,26 +1,39 @@
-from utils import AgentState, AIMessage
+from utils import AgentState, AIMessage, DEBUG
+
+_BANNER = "=" * 60
+# Also append each selection summary to state["Messages"]. Nothing downstream reads
+# host_assistant's message (the dashboard shows the latest trademaster message), so
+# by default it is only printed.
+EMIT_MESSAGES = False
+
+
+def _publish(state: AgentState, message_lines: list) -> None:
+    """Join the step's message lines once, print them and, if enabled, store them as the node's message."""
+    body = "\n".join(message_lines)
+    print("[HOST_ASSISTANT] Message:\n", body, sep="")
+    if EMIT_MESSAGES:
+        state["Messages"] = [AIMessage(content=body)]
+
 
 def host_assistant(state: AgentState) -> AgentState:
     """Host assistant function to update the agent state with current player selection."""
     if not state:
         raise ValueError("State cannot be None or empty.")
-    print(f"[HOST_ASSISTANT] Entered host_assistant(state) - RemainingSets={len(state.get('RemainingSets') or [])}, CurrentSet={state.get('CurrentSet')}, AuctionStatus={state.get('AuctionStatus')}", flush=True)
+    if DEBUG:
+        print(f"[HOST_ASSISTANT] Entered host_assistant(state) - RemainingSets={len(state.get('RemainingSets') or [])}, CurrentSet={state.get('CurrentSet')}, AuctionStatus={state.get('AuctionStatus')}")
     
-    message_lines = []
-    message_lines.append("="*60)
-    message_lines.append("HOST ASSISTANT - Selecting Player")
+    message_lines = [_BANNER, "HOST ASSISTANT - Selecting Player"]
+    
+    # Work on local references; state is only written when a value changes
+    current_set = state["CurrentSet"]
+    players_in_set = state.get("RemainingPlayersInSet")
     
     # Select a new set if current set is None or empty
-    if state["CurrentSet"] is None or not state.get("RemainingPlayersInSet"):
-        # Find a set with players
-        available_sets = [s for s in state["RemainingSets"] if state["RemainingPlayers"].get(s)]
+    if current_set is None or not players_in_set:
+        # RemainingSets only ever holds sets that still have players: empty sets
+        # are dropped at initialization and a set leaves the list once selected
+        available_sets = state["RemainingSets"]
         message_lines.append(f"Available sets with players: {available_sets}")
-        
-        
-        
-        # Update RemainingSets to only include available sets
-        state["RemainingSets"] = available_sets.copy()
-        message_lines.append(f"Updated RemainingSets to: {state['RemainingSets']}")
         if not available_sets:
             # No more players to auction - clear all state
             message_lines.append("No more players available!")
@@ -28,35 +41,37 @@ def host_assistant(state: AgentState) -> AgentState:
             state["RemainingPlayersInSet"] = None
             state["CurrentPlayer"] = None
             state["AuctionStatus"] = False
-            message_lines.append("="*60)
-            joined = "\n".join(message_lines).replace('\u20b9', 'INR ')
-            print("[HOST_ASSISTANT] Message:\n" + joined, flush=True)
-            state["Messages"] = [AIMessage(content=joined)]
+            message_lines.append(_BANNER)
+            _publish(state, message_lines)
             return state
-        state["CurrentSet"] = available_sets[0]
-        state["RemainingPlayersInSet"] = state["RemainingPlayers"][state["CurrentSet"]].copy()
-        state['RemainingSets'].remove(state["CurrentSet"])
-        state["RemainingPlayers"][state["CurrentSet"]] = []
-        message_lines.append(f"Selected set: {state['CurrentSet']}")
-        message_lines.append(f"Players in set: {len(state['RemainingPlayersInSet'])}")
+        current_set = available_sets[0]
+        state["CurrentSet"] = current_set
+        state['RemainingSets'] = available_sets[1:]  # new list: earlier state snapshots keep theirs
+        # Hand the set's list over instead of copying it; the set's slot in
+        # RemainingPlayers is left as an empty list, as before
+        remaining_players = state["RemainingPlayers"]
+        players_in_set = remaining_players[current_set]
+        remaining_players[current_set] = []
+        state["RemainingPlayersInSet"] = players_in_set
+        message_lines.append(f"Selected set: {current_set}")
+        message_lines.append(f"Players in set: {len(players_in_set)}")
     
     # Select a player from the current set
-    if state['RemainingPlayersInSet']:
-        state['CurrentPlayer'] = state['RemainingPlayersInSet'][0]
-        state['RemainingPlayersInSet'].remove(state['CurrentPlayer'])
+    if players_in_set:
+        # Take the next player in catalogue order; pop by position rather than
+        # list.remove, which rescans the set comparing every Player field
+        player = players_in_set.pop(0)
+        state['CurrentPlayer'] = player
         state['AuctionStatus'] = True
-        message_lines.append(f"Selected player: {state['CurrentPlayer'].name} ({state['CurrentPlayer'].specialism})")
-        reserve_cr = state['CurrentPlayer'].reserve_price_lakh / 100
-        message_lines.append(f"Reserve price: INR {reserve_cr:.2f} Cr")
-        message_lines.append(f"Remaining players in set: {len(state['RemainingPlayersInSet'])}")
+        message_lines.append(f"Selected player: {player.name} ({player.specialism})")
+        message_lines.append(f"Reserve price: INR {player.reserve_price_lakh / 100:.2f} Cr")
+        message_lines.append(f"Remaining players in set: {len(players_in_set)}")
         
         # Clear RemainingPlayersInSet if empty
-        if not state['RemainingPlayersInSet']:
+        if not players_in_set:
             state['RemainingPlayersInSet'] = None
             message_lines.append("Set completed - cleared RemainingPlayersInSet")
     
-    message_lines.append("="*60)
-    joined = "\n".join(message_lines).replace('\u20b9', 'INR ')
-    print("[HOST_ASSISTANT] Message:\n" + joined, flush=True)
-    state["Messages"] = [AIMessage(content=joined)]
-    return state
\ No newline at end of file
+    message_lines.append(_BANNER)
+    _publish(state, message_lines)
+    return state
@@ -1,3 +1,5 @@
+import functools
+import os
 import warnings
 import time
 from langgraph.graph import StateGraph, END
@@ -52,60 +54,65 @@ agent: AgentState = {
 
 
 
-# Build the graph
-graph_builder = StateGraph(AgentState)
+@functools.lru_cache(maxsize=1)
+def build_graph():
+    """Build and compile the auction graph once; later calls reuse the compiled graph."""
+    graph_builder = StateGraph(AgentState)
 
-# Add nodes
-graph_builder.add_node("data_loader", initialize_auction)
-graph_builder.add_node("host", lambda state: state)  # Host just passes state through
-graph_builder.add_node("host_assistant", host_assistant)
-graph_builder.add_node("bidder_pool", agent_pool)
-graph_builder.add_node("trademaster", trademaster)
-# Set entry point to data_loader
-graph_builder.set_entry_point("data_loader")
+    # Add nodes
+    graph_builder.add_node("data_loader", initialize_auction)
+    graph_builder.add_node("host", lambda state: state)  # Host just passes state through
+    graph_builder.add_node("host_assistant", host_assistant)
+    graph_builder.add_node("bidder_pool", agent_pool)
+    graph_builder.add_node("trademaster", trademaster)
+    # Set entry point to data_loader
+    graph_builder.set_entry_point("data_loader")
 
-# data_loader goes to host
-graph_builder.add_edge("data_loader", "host")
+    # data_loader goes to host
+    graph_builder.add_edge("data_loader", "host")
 
-# Add edges - all routing controlled by host
-# host routes to host_assistant, bidder_pool, or END
-graph_builder.add_conditional_edges(
-    "host",
-    host,
-    {
-        "host_assistant": "host_assistant",
-        "bidder_pool": "bidder_pool",
-        "end": END
-    }
-)
+    # Add edges - all routing controlled by host
+    # host routes to host_assistant, bidder_pool, or END
+    graph_builder.add_conditional_edges(
+        "host",
+        host,
+        {
+            "host_assistant": "host_assistant",
+            "bidder_pool": "bidder_pool",
+            "end": END
+        }
+    )
 
-# host_assistant reports back to host
-graph_builder.add_edge("host_assistant", "host")
+    # host_assistant reports back to host
+    graph_builder.add_edge("host_assistant", "host")
 
-# bidder_pool -> trademaster
-graph_builder.add_edge("bidder_pool", "trademaster")
+    # bidder_pool -> trademaster
+    graph_builder.add_edge("bidder_pool", "trademaster")
 
-# trademaster reports back to host
-graph_builder.add_edge("trademaster", "host")
+    # trademaster reports back to host
+    graph_builder.add_edge("trademaster", "host")
 
-# Compile the graph
-graph = graph_builder.compile()
+    # Compile the graph
+    return graph_builder.compile()
+
+graph = build_graph()
 
 # Run the auction
 prettyprint(agent)
 print("Starting auction...\n")
-# Save the graph visualization
-with open('graph_visualization.png', 'wb') as f:
-    f.write(graph.get_graph().draw_mermaid_png())
-print(f"[MAIN] Invoking graph with recursion_limit=10000, CurrentPlayer={getattr(agent.get('CurrentPlayer'), 'name', None)}", flush=True)
+# Save the graph visualization (renders through mermaid; opt in with WRITE_GRAPH_PNG=1)
+if os.environ.get("WRITE_GRAPH_PNG"):
+    with open('graph_visualization.png', 'wb') as f:
+        f.write(graph.get_graph().draw_mermaid_png())
+print(f"[MAIN] Invoking graph with recursion_limit=10000, CurrentPlayer={getattr(agent.get('CurrentPlayer'), 'name', None)}")
 # Run the graph with increased recursion limit and protect with logging
-print("[MAIN] About to invoke graph.invoke(...)", flush=True)
+print("[MAIN] About to invoke graph.invoke(...)")
 
 # Start timing the auction
 start_time = time.time()
 try:
     result = graph.invoke(agent, {"recursion_limit": 10000})
-    print("[MAIN] graph.invoke returned normally", flush=True)
+    print("[MAIN] graph.invoke returned normally")
 except Exception as e:
     print(f"[MAIN] Exception during graph.invoke: {type(e).__name__}: {e}", flush=True)
     raise
@@ -7,6 +7,14 @@ TEMPERATURE = 0.15
 TOP_P = 0.7
 MAX_TOKENS = 11617
 EXTRA_BODY = {"chat_template_kwargs": {"thinking":True}}
-WAIT_BETWEEN_REQUESTS = 0.6 # seconds - optimized for 40 requests/minute limit (60/35 = 1.71s)
+# Purchase-reason writer (reasoner.py): a lighter model with a short answer budget;
+# temperature and top_p are shared with the bidders
+REASONER_MODEL_NAME = "openai/gpt-oss-120b"
+REASONER_MAX_TOKENS = 4096
+REQUESTS_PER_MINUTE = 100 # per API key (the old 0.6 s stagger, 60 / 0.6) - enforced by a token bucket in agentpool
+REQUEST_BURST = 5 # requests a key may send back-to-back before pacing kicks in
+MAX_CONCURRENT_REQUESTS = 10 # cap on bidder requests in flight at once
+STREAM_BID_DECISIONS = True # stream bidder output so later teams are cancelled as soon as a raise is settled
+ENABLE_BID_PREFILTER = True # skip the LLM call for sure passes (full squad, or a bid that leaves the minimum squad unaffordable)
 
 # Structured output class is set where used; keep config minimal and simple.
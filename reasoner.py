@@ -1,26 +1,70 @@
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
 from langchain_core.messages import SystemMessage, HumanMessage
+import functools
 import re
 import os
-from model_config import MODEL_NAME, TEMPERATURE, TOP_P, MAX_TOKENS, EXTRA_BODY
-from utils import AgentState, Player, get_next_api_key, get_set_name
+import threading
+from typing import Optional, Tuple
+from model_config import REASONER_MODEL_NAME, REASONER_MAX_TOKENS, TEMPERATURE, TOP_P
+from utils import AgentState, Player, get_next_api_key, get_set_name, BUDGET_KEYS
 
-def _build_reasoner_prompt(state: AgentState, player: Player, winning_team: str, final_price: float) -> str:
-    # Collect team compositions and budgets
-    teams = ['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', 'PBKS', 'RR', 'RCB', 'SRH']
-    team_info_lines = []
-    for t in teams:
-        comp = state.get(t, [])
-        budget = state.get(f"{t}_Budget", 0.0)
-        team_info_lines.append(f"{t}: budget={budget}, squad_size={len(comp)}")
-
-    remaining_sets = state.get('RemainingSets', [])
+# Response clean-up patterns, compiled once
+_CONTENT_RE = re.compile(r"content\s*[:=]\s*['\"](.*?)['\"]")
+_SENTENCE_GAP_RE = re.compile(r'(?<=[\.\!\?])\s+')
+
+# Light system instruction, read once at import (as UTF-8, tolerant on Windows)
+_PROMPT_PATH = os.path.join(os.path.dirname(__file__), 'PROMPTS', 'ReasonerSysPrompt.txt')
+try:
+    with open(_PROMPT_PATH, 'r', encoding='utf-8', errors='ignore') as f:
+        _SYSTEM_PROMPT_TEXT = f.read()
+except FileNotFoundError:
+    # Fallback to old/case-variant path if needed
+    _ALT_PROMPT_PATH = os.path.join(os.path.dirname(__file__), 'Prompts', 'reasonerSysprompt.txt')
+    with open(_ALT_PROMPT_PATH, 'r', encoding='utf-8', errors='ignore') as f:
+        _SYSTEM_PROMPT_TEXT = f.read()
+_SYSTEM_MESSAGE = SystemMessage(content=_SYSTEM_PROMPT_TEXT)
+
+# One reasoner client per API key, reused across sales like the bidder clients
+_LLM_CACHE = {}
+_LLM_CACHE_LOCK = threading.Lock()
+
+def _get_reasoner_llm(api_key: Optional[str], api_key_id: Optional[int]) -> ChatNVIDIA:
+    """Return the cached reasoner LLM for an API key, creating it on first use."""
+    llm = _LLM_CACHE.get(api_key_id)
+    if llm is None:
+        with _LLM_CACHE_LOCK:
+            llm = _LLM_CACHE.get(api_key_id)
+            if llm is None:
+                llm = ChatNVIDIA(
+                    model=REASONER_MODEL_NAME,
+                    temperature=TEMPERATURE,
+                    top_p=TOP_P,
+                    max_tokens=REASONER_MAX_TOKENS,
+                    api_key=api_key
+                )
+                _LLM_CACHE[api_key_id] = llm
+    return llm
+
+@functools.lru_cache(maxsize=32)
+def _remaining_set_names(remaining_sets: Tuple[str, ...]) -> str:
+    """Render the remaining sets' full names for the prompt, once per distinct RemainingSets."""
     # Convert set abbreviations to full names like agentpool does
     try:
-        remaining_sets_full = get_set_name(remaining_sets)
+        return str(get_set_name(list(remaining_sets)))
     except Exception:
-        remaining_sets_full = remaining_sets
-    remaining_players_in_set = state.get('RemainingPlayersInSet', [])
+        return str(list(remaining_sets))
+
+def _build_reasoner_prompt(state: AgentState, player: Player, winning_team: str, final_price: float) -> str:
+    # Collect team compositions and budgets
+    team_info = "\n".join(
+        f"{t}: budget={state.get(bk, 0.0)}, squad_size={len(state.get(t, ()))}" for t, bk in BUDGET_KEYS.items()
+    )
+
+    # RemainingSets only changes when a set is opened, so most sales reuse the cached names
+    remaining_sets_full = _remaining_set_names(tuple(state.get('RemainingSets') or ()))
+    # Name and specialism only, as agentpool does; the Player repr would inline every player's full stats
+    remaining_in_set = state.get('RemainingPlayersInSet') or []
+    remaining_players_in_set = ", ".join(f"{p.name} ({p.specialism})" for p in remaining_in_set) or "None"
 
     player_stats = player.stats
 
@@ -38,18 +82,15 @@ def _build_reasoner_prompt(state: AgentState, player: Player, winning_team: str,
     f"Player status: {player.player_status}\n"
     f"Reserve price: ₹{player.reserve_price_lakh} Lakhs ({reserve_price_cr:.2f} Cr)\n"
     f"Player stats: {player_stats}\n\n"
-    "Teams summary:\n" + "\n".join(team_info_lines) + "\n\n"
+    f"Teams summary:\n{team_info}\n\n"
     f"Available sets left: {remaining_sets_full}\n"
     f"Available players in current set: {remaining_players_in_set}\n"
 )
 
     return human
 
-def generate_purchase_reason(state: AgentState, player: Player, winning_team: str, final_price: float) -> str:
-    """Call LLM to generate a single-paragraph reason+suggestion string.
-
-    Returns: single string (one paragraph) containing the reason and short suggestions.
-    """
+def _prepare_reason_call(state: AgentState, player: Player, winning_team: str, final_price: float):
+    """Build the reasoner client and the [system, human] messages for one sale."""
     human_prompt = _build_reasoner_prompt(state, player, winning_team, final_price)
 
     api_key = None
@@ -63,61 +104,62 @@ def generate_purchase_reason(state: AgentState, player: Player, winning_team: st
     # Log which API key index is used for the reasoner call
     if api_key_id is not None:
         print(f"Reasoner: Using NVIDIA API key #{api_key_id}")
-    MODEL_NAME = "openai/gpt-oss-120b"
-    llm = ChatNVIDIA(
-        model=MODEL_NAME,
-        temperature=TEMPERATURE,
-        top_p=TOP_P,
-        max_tokens=4096,
-        api_key=api_key #,
-        # extra_body=EXTRA_BODY,
-    )
+    llm = _get_reasoner_llm(api_key, api_key_id)
 
-    # Use a light system instruction (read as UTF-8, tolerant on Windows)
-    prompt_path = os.path.join(os.path.dirname(__file__), 'PROMPTS', 'ReasonerSysPrompt.txt')
-    try:
-        with open(prompt_path, 'r', encoding='utf-8', errors='ignore') as f:
-            system_prompt_text = f.read()
-    except FileNotFoundError:
-        # Fallback to old/case-variant path if needed
-        alt_path = os.path.join(os.path.dirname(__file__), 'Prompts', 'reasonerSysprompt.txt')
-        with open(alt_path, 'r', encoding='utf-8', errors='ignore') as f:
-            system_prompt_text = f.read()
-    system = SystemMessage(content=system_prompt_text)
     human = HumanMessage(content=human_prompt)
-    print("Invoking reasoner LLM...")
-    # print("Prompt:", flush=True)
-    # print(system, flush=True)
-    # print(human, flush=True)
-    try:
-        response = llm.invoke([system, human])
-        # Try to extract assistant content safely
-        if hasattr(response, 'content') and isinstance(response.content, str):
-            text = response.content
-        elif isinstance(response, dict):
-            # common key names
-            text = response.get('content') or response.get('text') or str(response)
-        else:
-            s = str(response)
-            # look for patterns like content='...' or "content": '...'
-            m = re.search(r"content\s*[:=]\s*['\"](.*?)['\"]", s)
-            if m:
-                text = m.group(1)
-            else:
-                text = s
-    except Exception:
-        # Fallback text if model call fails
-        text = f"{winning_team} acquiring {player.name} at INR {final_price:.2f} is a strategic move due to squad balance and available budget."
+    return llm, [_SYSTEM_MESSAGE, human]
+
+def _response_text(response) -> str:
+    """Extract the assistant text from a reasoner LLM response."""
+    if hasattr(response, 'content') and isinstance(response.content, str):
+        return response.content
+    if isinstance(response, dict):
+        # common key names
+        return response.get('content') or response.get('text') or str(response)
+    s = str(response)
+    # look for patterns like content='...' or "content": '...'
+    m = _CONTENT_RE.search(s)
+    if m:
+        return m.group(1)
+    return s
 
-    # Clean text and return all sentences as a single paragraph (no metadata)
+def _fallback_reason(player: Player, winning_team: str, final_price: float) -> str:
+    """Reason text used when the model call fails."""
+    return f"{winning_team} acquiring {player.name} at INR {final_price:.2f} is a strategic move due to squad balance and available budget."
+
+def _clean_reason(text: str) -> str:
+    """Clean text and return all sentences as a single paragraph (no metadata)."""
     # Normalize whitespace and remove surrounding quotes
     text = text.strip().strip('"').strip("'")
-    # Split into sentences
-    sentences = re.split(r'(?<=[\.\!\?])\s+', text)
-    # Filter out empty sentences and join all as a single paragraph
-    non_empty_sentences = [s.strip() for s in sentences if s.strip()]
-    essay_text = ' '.join(non_empty_sentences) if non_empty_sentences else text
+    # Join all sentences into a single paragraph in one pass: collapse the gap
+    # after each sentence terminator to a single space
+    essay_text = _SENTENCE_GAP_RE.sub(' ', text).strip()
     # Ensure it ends with a period
-    if not re.search(r'[\.\!\?]$', essay_text):
-        essay_text = essay_text.rstrip() + '.'
+    if not essay_text or essay_text[-1] not in '.!?':
+        essay_text += '.'
     return essay_text
+
+def generate_purchase_reason(state: AgentState, player: Player, winning_team: str, final_price: float) -> str:
+    """Call LLM to generate a single-paragraph reason+suggestion string.
+
+    Returns: single string (one paragraph) containing the reason and short suggestions.
+    """
+    llm, messages = _prepare_reason_call(state, player, winning_team, final_price)
+    print("Invoking reasoner LLM...")
+    try:
+        text = _response_text(llm.invoke(messages))
+    except Exception:
+        # Fallback text if model call fails
+        text = _fallback_reason(player, winning_team, final_price)
+    return _clean_reason(text)
+
+async def agenerate_purchase_reason(state: AgentState, player: Player, winning_team: str, final_price: float) -> str:
+    """Async version of generate_purchase_reason; awaits the model instead of blocking on it."""
+    llm, messages = _prepare_reason_call(state, player, winning_team, final_price)
+    print("Invoking reasoner LLM...")
+    try:
+        text = _response_text(await llm.ainvoke(messages))
+    except Exception:
+        # Fallback text if model call fails
+        text = _fallback_reason(player, winning_team, final_price)
+    return _clean_reason(text)
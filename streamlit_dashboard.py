@@ -1,17 +1,18 @@
 import streamlit as st
+import asyncio
+import queue
+import threading
 import warnings
 import pickle
 import os
 from datetime import datetime
-from langgraph.graph import StateGraph, END
-from utils import AgentState, get_raise_amount, Player, load_api_keys, export_sold_players_to_csv
-from data_loader import load_player_data, initialize_auction
-from host import host
-from host_assistant import host_assistant
-from agentpool import agent_pool
-from trade_master import trademaster
+from itertools import islice
+from utils import AgentState, get_raise_amount, Player, load_api_keys, export_sold_players_to_csv, DEBUG
 import plotly.graph_objects as go
 
+# Colour marker shown next to each franchise in the teams overview
+TEAM_COLORS = {'CSK': '🟡', 'DC': '🔵', 'GT': '🔷', 'KKR': '🟣', 'LSG': '🔹', 'MI': '🔵', 'PBKS': '🟠', 'RR': '🔴', 'RCB': '❤️', 'SRH': '🟠'}
+
 # Suppress warnings
 warnings.filterwarnings('ignore')
 
@@ -24,6 +25,10 @@ def init_session_state():
         st.session_state.auction_running = False
     if 'bid_history' not in st.session_state:
         st.session_state.bid_history = []
+    if 'active_bids' not in st.session_state:
+        st.session_state.active_bids = {}  # player name -> that player's Active bid_history entries
+    if 'sold_players' not in st.session_state:
+        st.session_state.sold_players = {}  # player name -> (team, price, reason) once seen in a roster
     if 'teams' not in st.session_state:
         st.session_state.teams = {'CSK': [], 'DC': [], 'GT': [], 'KKR': [], 'LSG': [], 'MI': [], 'PBKS': [], 'RR': [], 'RCB': [], 'SRH': []}
     if 'budgets' not in st.session_state:
@@ -32,8 +37,10 @@ def init_session_state():
         st.session_state.host_active = False
     if 'current_state' not in st.session_state:
         st.session_state.current_state = None
-    if 'stream_iterator' not in st.session_state:
-        st.session_state.stream_iterator = None
+    if 'stream_queue' not in st.session_state:
+        st.session_state.stream_queue = None
+    if 'stream_future' not in st.session_state:
+        st.session_state.stream_future = None
     if 'current_set' not in st.session_state:
         st.session_state.current_set = None
     if 'remaining_sets' not in st.session_state:
@@ -45,15 +52,24 @@ def init_session_state():
     if 'csv_generated' not in st.session_state:
         st.session_state.csv_generated = False
 
+@st.cache_resource
 def create_graph():
-    """Create and return the LangGraph"""
+    """Create and return the LangGraph, compiled once per server process"""
+    # Imported here so the page renders before the node modules (and the NVIDIA client stack) load
+    from langgraph.graph import StateGraph, END
+    from data_loader import initialize_auction
+    from host import host
+    from host_assistant import host_assistant
+    from agentpool import agent_pool_async
+    from trade_master import trademaster_async
+
     graph_builder = StateGraph(AgentState)
     
     graph_builder.add_node("data_loader", initialize_auction)
     graph_builder.add_node("host", lambda state: state)
     graph_builder.add_node("host_assistant", host_assistant)
-    graph_builder.add_node("bidder_pool", agent_pool)
-    graph_builder.add_node("trademaster", trademaster)
+    graph_builder.add_node("bidder_pool", agent_pool_async)  # awaited on the astream loop
+    graph_builder.add_node("trademaster", trademaster_async)  # awaits the purchase reasoner
     
     graph_builder.set_entry_point("data_loader")
     
@@ -70,9 +86,63 @@ def create_graph():
     
     return graph_builder.compile()
 
+# Marks the end of the graph stream in the dashboard's state queue
+_STREAM_DONE = object()
+
+def get_event_loop():
+    """Return this session's background event loop, starting it on first use"""
+    loop = st.session_state.get('event_loop')
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, daemon=True).start()
+        st.session_state.event_loop = loop
+    return loop
+
+def _snapshot(state):
+    """Copy a streamed state's containers so the UI is not reading lists the graph keeps mutating.
+
+    Rosters and the other lists are copied one level deep; Player objects are shared, as players
+    are only added to a roster once their sale is final.
+    """
+    snapshot = {}
+    for key, value in state.items():
+        if isinstance(value, list):
+            value = list(value)
+        elif isinstance(value, dict):
+            value = {k: list(v) if isinstance(v, list) else v for k, v in value.items()}
+        snapshot[key] = value
+    return snapshot
+
+async def _consume(stream, state_queue):
+    """Push a snapshot of every state from the graph stream onto the queue, then the end marker"""
+    try:
+        async for state in stream:
+            state_queue.put_nowait(_snapshot(state))
+    except Exception as e:
+        state_queue.put_nowait(e)
+    finally:
+        state_queue.put_nowait(_STREAM_DONE)
+
+def stop_stream():
+    """Cancel the background graph stream, if one is running"""
+    future = st.session_state.get('stream_future')
+    if future is not None:
+        future.cancel()
+    st.session_state.stream_future = None
+    st.session_state.stream_queue = None
+
+def _mark_sold(bid, team, price, reason):
+    """Mark a bid_history entry as won by the final sale"""
+    bid['status'] = 'SOLD'
+    bid['final_team'] = team
+    bid['final_price'] = price
+    if reason is not None:
+        bid['purchase_reason'] = reason
+
 def process_state_update(state, node_name=None):
     """Process a state update and extract relevant information"""
-    print(f"[DEBUG] Processing state update - CurrentPlayer: {state.get('CurrentPlayer', {}).name if state.get('CurrentPlayer') else 'None'}")
+    if DEBUG:
+        print(f"[DEBUG] Processing state update - CurrentPlayer: {state.get('CurrentPlayer', {}).name if state.get('CurrentPlayer') else 'None'}")
     st.session_state.current_state = state
     
     # Update host status
@@ -93,8 +163,9 @@ def process_state_update(state, node_name=None):
     # Extract bid from OtherTeamBidding
     other_bid = state.get("OtherTeamBidding")
     
-    print(f"[DEBUG] OtherTeamBidding: {other_bid}")
-    print(f"[DEBUG] Has reason attr: {hasattr(other_bid, 'reason') if other_bid else False}")
+    if DEBUG:
+        print(f"[DEBUG] OtherTeamBidding: {other_bid}")
+        print(f"[DEBUG] Has reason attr: {hasattr(other_bid, 'reason') if other_bid else False}")
     
     # Update team info and budgets
     for team in ['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', 'PBKS', 'RR', 'RCB', 'SRH']:
@@ -137,21 +208,30 @@ def process_state_update(state, node_name=None):
             'status': 'Active' if other_bid.is_raise else 'Pass'
         }
         st.session_state.bid_history.append(bid_entry)
-        print(f"[DEBUG] Added {bid_action}: {bid_entry}")
-    
-    # Check for finalized sales
+        if other_bid.is_raise:
+            sale = st.session_state.sold_players.get(current_player.name)
+            if sale is not None:
+                # The player already reached a roster in an earlier update
+                _mark_sold(bid_entry, *sale)
+            else:
+                st.session_state.active_bids.setdefault(current_player.name, []).append(bid_entry)
+        if DEBUG:
+            print(f"[DEBUG] Added {bid_action}: {bid_entry}")
+    
+    # Check for finalized sales: record each player's sale when they first appear in a roster and
+    # mark their Active bids SOLD; raises seen after that are marked on arrival (above)
+    sold_players = st.session_state.sold_players
+    active_bids = st.session_state.active_bids
     for team in ['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', 'PBKS', 'RR', 'RCB', 'SRH']:
         team_players = state.get(team, [])
         
         for player in team_players:
-            if hasattr(player, 'sold_price') and player.sold_price > 0:
-                for bid in st.session_state.bid_history:
-                    if bid['player'] == player.name and bid.get('status') == 'Active':
-                        bid['status'] = 'SOLD'
-                        bid['final_team'] = team
-                        bid['final_price'] = player.sold_price
-                        if hasattr(player, 'reason_for_purchase'):
-                            bid['purchase_reason'] = player.reason_for_purchase
+            if player.name in sold_players or getattr(player, 'sold_price', 0) <= 0:
+                continue
+            sale = (team, player.sold_price, getattr(player, 'reason_for_purchase', None))
+            sold_players[player.name] = sale
+            for bid in active_bids.pop(player.name, ()):
+                _mark_sold(bid, *sale)
     
     # Extract trade message for display
     messages = state.get("Messages", [])
@@ -163,7 +243,7 @@ def process_state_update(state, node_name=None):
         'bidder': current_bid.team if current_bid else "None",
         'round': current_round,
         'remaining_count': len(remaining_in_set) if remaining_in_set else 0,
-        'remaining_players': [p.name for p in remaining_in_set[:5]] if remaining_in_set else [],
+        'remaining_players': tuple(p.name for p in islice(remaining_in_set or (), 5)),
         'trade_message': trade_message,
         'bid_reason': ''
     }
@@ -300,8 +380,7 @@ def render_ui():
             budget = st.session_state.budgets[team]
             spent = 125.0 - budget
             
-            team_colors = {'CSK': '🟡', 'DC': '🔵', 'GT': '🔷', 'KKR': '🟣', 'LSG': '🔹', 'MI': '🔵', 'PBKS': '🟠', 'RR': '🔴', 'RCB': '❤️', 'SRH': '🟠'}
-            team_circle = team_colors.get(team, '⚪')
+            team_circle = TEAM_COLORS.get(team, '⚪')
             
             st.markdown(f"### {team_circle} {team}")
             st.metric("Players", len(players))
@@ -330,8 +409,7 @@ def render_ui():
             budget = st.session_state.budgets[team]
             spent = 125.0 - budget
             
-            team_colors = {'CSK': '🟡', 'DC': '🔵', 'GT': '🔷', 'KKR': '🟣', 'LSG': '🔹', 'MI': '🔵', 'PBKS': '🟠', 'RR': '🔴', 'RCB': '❤️', 'SRH': '🟠'}
-            team_circle = team_colors.get(team, '⚪')
+            team_circle = TEAM_COLORS.get(team, '⚪')
             
             st.markdown(f"### {team_circle} {team}")
             st.metric("Players", len(players))
@@ -391,7 +469,7 @@ def render_ui():
                 if remaining_in_set:
                     st.write(f"**Remaining in Set:** {len(remaining_in_set)} players")
                     if len(remaining_in_set) > 0:
-                        st.write("**Next:** " + ", ".join([p.name for p in remaining_in_set[:5]]))
+                        st.write("**Next:** " + ", ".join(p.name for p in islice(remaining_in_set, 5)))
             else:
                 st.info("Waiting for next player...")
         
@@ -446,7 +524,8 @@ def render_ui():
 
 def start_auction():
     """Initialize auction stream"""
-    print("[DEBUG] Starting auction...")
+    if DEBUG:
+        print("[DEBUG] Starting auction...")
     initial_state: AgentState = {
         'RemainingPlayers': {},
         'RemainingSets': [],
@@ -481,46 +560,63 @@ def start_auction():
         'Messages': []
     }
     
-    print("[DEBUG] Creating graph...")
+    if DEBUG:
+        print("[DEBUG] Creating graph...")
     graph = create_graph()
-    print("[DEBUG] Starting stream...")
+    if DEBUG:
+        print("[DEBUG] Starting stream...")
     config = {"recursion_limit": 10000}
-    st.session_state.stream_iterator = graph.stream(initial_state, config, stream_mode="values")
+    # Run the graph on the background loop; each rerun drains whatever states it has produced
+    stream = graph.astream(initial_state, config, stream_mode="values")
+    st.session_state.stream_queue = queue.Queue()
+    st.session_state.stream_future = asyncio.run_coroutine_threadsafe(
+        _consume(stream, st.session_state.stream_queue), get_event_loop()
+    )
     st.session_state.auction_running = True
     st.session_state.auction_completed = False
-    print("[DEBUG] Auction started!")
+    if DEBUG:
+        print("[DEBUG] Auction started!")
 
 def process_next_state():
-    """Process next state from stream"""
+    """Process the states the background stream has produced since the last rerun"""
+    state_queue = st.session_state.stream_queue
     try:
-        if st.session_state.stream_iterator:
-            print("[DEBUG] Getting next state...")
-            state = next(st.session_state.stream_iterator)
-            print(f"[DEBUG] Got state with keys: {list(state.keys())}")
-            process_state_update(state)
+        # Wait briefly for the next node to finish, then take everything already queued
+        item = state_queue.get(timeout=0.5)
+    except queue.Empty:
+        return True
+    while True:
+        if item is _STREAM_DONE:
+            if DEBUG:
+                print("[DEBUG] Stream completed")
+            st.session_state.auction_running = False
+            st.session_state.stream_queue = None
+            st.session_state.stream_future = None
+            st.session_state.auction_completed = True
+            # Auto-generate CSV when auction completes
+            if not st.session_state.csv_generated and st.session_state.current_state:
+                try:
+                    export_sold_players_to_csv(st.session_state.current_state, "streamlit_auction_sold_players.csv")
+                    st.session_state.csv_generated = True
+                except Exception as e:
+                    print(f"[DEBUG] Error exporting CSV: {e}")
+            # Force rerun to show completion UI
+            st.rerun()
+            return False
+        if isinstance(item, Exception):
+            print(f"[DEBUG] Stream error: {item}")
+            st.session_state.auction_running = False
+            st.session_state.auction_error = str(item)
+            stop_stream()
+            st.rerun()
+            return False
+        if DEBUG:
+            print(f"[DEBUG] Got state with keys: {list(item.keys())}")
+        process_state_update(item)
+        try:
+            item = state_queue.get_nowait()
+        except queue.Empty:
             return True
-    except StopIteration:
-        print("[DEBUG] Stream completed")
-        st.session_state.auction_running = False
-        st.session_state.stream_iterator = None
-        st.session_state.auction_completed = True
-        # Auto-generate CSV when auction completes
-        if not st.session_state.csv_generated and st.session_state.current_state:
-            try:
-                export_sold_players_to_csv(st.session_state.current_state, "streamlit_auction_sold_players.csv")
-                st.session_state.csv_generated = True
-            except Exception as e:
-                print(f"[DEBUG] Error exporting CSV: {e}")
-        # Force rerun to show completion UI
-        st.rerun()
-        return False
-    except Exception as e:
-        print(f"[DEBUG] Stream error: {e}")
-        st.session_state.auction_running = False
-        st.session_state.auction_error = str(e)
-        st.rerun()
-        return False
-    return False
 
 def save_state_to_file():
     """Save current state to pickle file"""
@@ -543,6 +639,8 @@ def main():
     with col1:
         if st.button("🚀 Start Mock Auction", key="start_btn", disabled=st.session_state.auction_running):
             st.session_state.bid_history = []
+            st.session_state.active_bids = {}
+            st.session_state.sold_players = {}
             st.session_state.teams = {'CSK': [], 'DC': [], 'GT': [], 'KKR': [], 'LSG': [], 'MI': [], 'PBKS': [], 'RR': [], 'RCB': [], 'SRH': []}
             st.session_state.budgets = {'CSK': 125.0, 'DC': 125.0, 'GT': 125.0, 'KKR': 125.0, 'LSG': 125.0, 'MI': 125.0, 'PBKS': 125.0, 'RR': 125.0, 'RCB': 125.0, 'SRH': 125.0}
             st.session_state.unsold_players = []
@@ -553,7 +651,7 @@ def main():
         if st.button("💾 Save & Stop", key="save_btn", disabled=not st.session_state.auction_running):
             filename = save_state_to_file()
             st.session_state.auction_running = False
-            st.session_state.stream_iterator = None
+            stop_stream()
             if filename:
                 st.success(f"State saved to {filename}")
             st.rerun()
@@ -561,7 +659,7 @@ def main():
     with col3:
         if st.button("⏸️ Stop Auction", key="stop_btn", disabled=not st.session_state.auction_running):
             st.session_state.auction_running = False
-            st.session_state.stream_iterator = None
+            stop_stream()
             st.session_state.auction_completed = False
             st.warning("Auction stopped!")
             st.rerun()
@@ -581,8 +679,8 @@ def main():
     with col5:
         if st.button("🔄 Reset Dashboard", key="reset_btn"):
             st.session_state.auction_running = False
-            st.session_state.stream_iterator = None
-            for key in ['bid_history', 'teams', 'budgets', 'current_state', 'auction_error', 'auction_completed', 'unsold_players', 'csv_generated']:
+            stop_stream()
+            for key in ['bid_history', 'active_bids', 'sold_players', 'teams', 'budgets', 'current_state', 'auction_error', 'auction_completed', 'unsold_players', 'csv_generated']:
                 if key in st.session_state:
                     del st.session_state[key]
             st.rerun()
@@ -599,10 +697,9 @@ def main():
     render_ui()
     
     # Process next auction state if running
-    if st.session_state.auction_running and st.session_state.stream_iterator:
+    # process_next_state already waits on the stream queue, so rerun straight away
+    if st.session_state.auction_running and st.session_state.stream_queue:
         if process_next_state():
-            import time
-            time.sleep(0.1)
             st.rerun()
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
-from utils import AgentState, CurrentBidInfo, get_raise_amount, AIMessage
-from reasoner import generate_purchase_reason
+from typing import Optional, Tuple, Union
+from utils import AgentState, CurrentBidInfo, Player, get_raise_amount, is_valid_raise, AIMessage, BUDGET_KEYS
+from reasoner import generate_purchase_reason, agenerate_purchase_reason
 
 def trademaster(state: AgentState) -> AgentState:
     """Trade master function optimized to process single bid from agent pool.
@@ -9,6 +10,37 @@ def trademaster(state: AgentState) -> AgentState:
     2. For first bid, minimum raise is zero (can bid at base price)
     3. Updates CurrentBid or finalizes auction based on round limits
     """
+    return _trademaster(state)
+
+async def trademaster_async(state: AgentState) -> AgentState:
+    """Async trademaster node (graph.astream): awaits the purchase reason of a sale instead of blocking on it."""
+    if not state:
+        raise ValueError("State cannot be None or empty.")
+    sale = _pending_sale(state)
+    reason = None
+    if sale is not None:
+        try:
+            reason = await agenerate_purchase_reason(state, *sale)
+        except Exception as e:
+            reason = e
+    return _trademaster(state, reason)
+
+def _pending_sale(state: AgentState) -> Optional[Tuple[Player, str, float]]:
+    """Return (player, winning_team, final_price) if this trademaster step will finalize a sale, else None."""
+    current_player = state.get("CurrentPlayer")
+    current_bid = state.get("CurrentBid")
+    if (
+        current_player
+        and state.get("OtherTeamBidding") is None
+        and current_bid is not None
+        and current_bid.team
+        and state.get("Round", 0) + 1 > 2
+    ):
+        return current_player, current_bid.team, current_bid.current_bid_amount
+    return None
+
+def _trademaster(state: AgentState, reason: Union[str, Exception, None] = None) -> AgentState:
+    """Trademaster step; `reason` is the sale's purchase reason (or its error) when already generated."""
     if not state:
         raise ValueError("State cannot be None or empty.")
     
@@ -30,7 +62,7 @@ def trademaster(state: AgentState) -> AgentState:
     if not current_player:
         message_lines.append("No current player, returning")
         message_lines.append("="*60)
-        print("[TRADEMASTER] Message:\n" + "\n".join(message_lines), flush=True)
+        print("[TRADEMASTER] Message:\n" + "\n".join(message_lines))
         state["Messages"] = [AIMessage(content="\n".join(message_lines))]
         return state
     
@@ -49,7 +81,7 @@ def trademaster(state: AgentState) -> AgentState:
         message_lines.append("Reset state for next player")
         message_lines.append("="*60)
         
-        print("[TRADEMASTER] Message:\n" + "\n".join(message_lines), flush=True)
+        print("[TRADEMASTER] Message:\n" + "\n".join(message_lines))
         state["Messages"] = [AIMessage(content="\n".join(message_lines))]
         return state
     
@@ -79,7 +111,11 @@ def trademaster(state: AgentState) -> AgentState:
                 player.sold_team = winning_team
                 # If round > 2, generate AI reason and suggestions for the purchase
                 try:
-                    reason_text = generate_purchase_reason(state, player, winning_team, final_price)
+                    if reason is None:
+                        reason = generate_purchase_reason(state, player, winning_team, final_price)
+                    if isinstance(reason, Exception):
+                        raise reason
+                    reason_text = reason
                     player.reason_for_purchase = reason_text
                     message_lines.append(f"AI Reason+Suggestions: {reason_text}")
                 except Exception as e:
@@ -90,7 +126,7 @@ def trademaster(state: AgentState) -> AgentState:
                     state[winning_team].append(player)
                 
                 # Deduct from team budget
-                budget_key = f"{winning_team}_Budget"
+                budget_key = BUDGET_KEYS.get(winning_team)
                 if budget_key in state:
                     state[budget_key] -= final_price
                 
@@ -109,7 +145,7 @@ def trademaster(state: AgentState) -> AgentState:
                 state["OtherTeamBidding"] = None
                 state['AuctionStatus'] = False
         
-        print("[TRADEMASTER] Message:\n" + "\n".join(message_lines), flush=True)
+        print("[TRADEMASTER] Message:\n" + "\n".join(message_lines))
         state["Messages"] = [AIMessage(content="\n".join(message_lines))]
         return state
     
@@ -117,7 +153,7 @@ def trademaster(state: AgentState) -> AgentState:
     else:
         message_lines.append("\nCASE 3: Processing new bid")
         team_name = other_bid.team
-        budget_key = f"{team_name}_Budget"
+        budget_key = BUDGET_KEYS.get(team_name)
         team_budget = state.get(budget_key, 0.0)
         
         # Calculate bid amount
@@ -137,18 +173,13 @@ def trademaster(state: AgentState) -> AgentState:
             # Subsequent bid - normal raise rules apply
             current_price = current_bid_obj.current_bid_amount
             if other_bid.is_raise:
-                if other_bid.is_normal:
-                    raise_amt = get_raise_amount(current_price)
-                    bid_amount = current_price + raise_amt
-                else:
-                    min_required = get_raise_amount(current_price)
-                    if other_bid.raised_amount >= min_required:
-                        bid_amount = current_price + other_bid.raised_amount
-                    else:
-                        message_lines.append(f"Invalid custom raise: {other_bid.raised_amount} < {min_required}")
-                        state["Round"] = current_round + 1
-                        state["OtherTeamBidding"] = None
-                        return state
+                min_required = get_raise_amount(current_price)
+                if not is_valid_raise(other_bid.is_raise, other_bid.is_normal, other_bid.raised_amount, min_required):
+                    message_lines.append(f"Invalid custom raise: {other_bid.raised_amount} < {min_required}")
+                    state["Round"] = current_round + 1
+                    state["OtherTeamBidding"] = None
+                    return state
+                bid_amount = current_price + (min_required if other_bid.is_normal else other_bid.raised_amount)
             else:
                 message_lines.append("Invalid bid - not a raise")
                 state["OtherTeamBidding"] = None
@@ -173,6 +204,6 @@ def trademaster(state: AgentState) -> AgentState:
         
         state["OtherTeamBidding"] = None
         message_lines.append("="*60)
-        print("[TRADEMASTER] Message:\n" + "\n".join(message_lines), flush=True)
+        print("[TRADEMASTER] Message:\n" + "\n".join(message_lines))
         state["Messages"] = [AIMessage(content="\n".join(message_lines))]
         return state
\ No newline at end of file
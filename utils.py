@@ -7,8 +7,10 @@ import random
 import csv
 import os
 import itertools
+import threading
 import json
-from pydantic import BaseModel, Field
+import mmap
+from pydantic import BaseModel, ConfigDict, Field
 
 # --- API Key Management ---
 def load_api_keys():
@@ -38,16 +40,44 @@ api_key_cycle = itertools.cycle(api_keys)
 # Maintain a parallel cycle of 1-based indices so callers can know which key was used
 api_key_index_cycle = itertools.cycle(range(1, len(api_keys) + 1))
 
+# Keeps the key and index cycles in step when keys are drawn from several threads
+api_key_lock = threading.Lock()
+
 def get_next_api_key():
     """Get the next API key and its 1-based index from the cycle.
 
     Returns:
         tuple[str, int]: (api_key, api_key_index)
     """
-    key = next(api_key_cycle)
-    idx = next(api_key_index_cycle)
+    with api_key_lock:
+        key = next(api_key_cycle)
+        idx = next(api_key_index_cycle)
     return key, idx
 
+def get_next_api_keys(n: int) -> List[tuple]:
+    """Get the next n API keys and their 1-based indices from the cycle in one step.
+
+    Returns:
+        list[tuple[str, int]]: n consecutive (api_key, api_key_index) pairs
+    """
+    with api_key_lock:
+        return [(next(api_key_cycle), next(api_key_index_cycle)) for _ in range(n)]
+
+# Verbose diagnostics (full tracebacks, debug prints); off unless AUCTION_DEBUG=1
+DEBUG = os.getenv("AUCTION_DEBUG", "0") == "1"
+
+# Franchise codes in the canonical order used throughout the auction
+TEAMS = ('CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', 'PBKS', 'RR', 'RCB', 'SRH')
+# State key holding each team's remaining purse, e.g. BUDGET_KEYS['CSK'] == 'CSK_Budget'
+BUDGET_KEYS = {t: f"{t}_Budget" for t in TEAMS}
+
+# Maximum number of players a franchise may hold (retained + bought)
+MAX_SQUAD_SIZE = 25
+# Minimum squad a franchise must complete (the 16-player minimum stated in PROMPTS/Sys.txt and
+# ReasonerSysPrompt.txt), and the lowest reserve price in the player pool (Cr)
+MIN_SQUAD_SIZE = 16
+MIN_RESERVE_PRICE_CR = 0.30
+
 class BidDecisionDict(TypedDict):
     """Expected format for bid_decision parameter."""
     is_raise: bool
@@ -59,7 +89,70 @@ class BidResponseDict(TypedDict):
     status: str
     bid_decision: BidDecisionDict
 
-@dataclass
+@dataclass(slots=True)
+class BidHistoryEntry:
+    """One team's decision on a player in one bidding round."""
+    round: int
+    decision: Literal['raise', 'pass', 'Retained']
+    reason: str
+    current_price: float = 0.0  # Price on the table when the decision was made (retention price for retained players)
+    is_normal: Optional[bool] = None  # Only set for raises
+    raised_amount: Optional[float] = None  # Only set for raises
+
+class LazyStats:
+    """Player stats text that is read from its file on first use.
+    
+    Behaves like the stats string wherever it is formatted (str, f-strings,
+    repr). The file is mapped once and kept as raw UTF-8 bytes; decoding
+    happens only when the text is actually needed, e.g. at prompt assembly.
+    A missing or unreadable file resolves to "". Pickles with its bytes, so
+    saved states do not depend on DB/stats.
+    """
+    __slots__ = ('path', '_data')
+    
+    def __init__(self, path: str, data: Optional[bytes] = None):
+        self.path = path
+        self._data = data
+    
+    def raw(self) -> bytes:
+        """Return the undecoded file contents, reading the file on first call."""
+        if self._data is None:
+            try:
+                with open(self.path, 'rb') as f:
+                    try:
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            self._data = mm[:]
+                    except ValueError:
+                        self._data = b""  # mmap refuses empty files
+            except OSError:
+                self._data = b""
+        return self._data
+    
+    def __str__(self) -> str:
+        return self.raw().decode('utf-8', errors='ignore').replace('\r\n', '\n')
+    
+    def __repr__(self) -> str:
+        return repr(str(self))
+    
+    def __format__(self, spec: str) -> str:
+        return format(str(self), spec)
+    
+    def __eq__(self, other) -> bool:
+        return str(self) == str(other)
+    
+    def __hash__(self) -> int:
+        return hash(str(self))
+    
+    def __len__(self) -> int:
+        return len(str(self))
+    
+    def __bool__(self) -> bool:
+        return bool(self.raw())
+    
+    def __reduce__(self):
+        return (LazyStats, (self.path, self.raw()))
+
+@dataclass(slots=True)
 class Player:
     name: str
     specialism: str
@@ -72,15 +165,15 @@ class Player:
     player_status: str
     reserve_price_lakh: float
     set: str
-    stats: str = ""
+    stats: Union[str, LazyStats] = ""  # LazyStats for auction pool players, read on first use
     status: bool = False
     sold_price: float = 0.0
     sold_team: Union[Literal['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', 'PBKS', 'RR', 'RCB', 'SRH'], None] = None
     # Reason why the player was purchased (populated by AI reasoner at purchase time)
     reason_for_purchase: Union[str, None] = None
     # Store all team bid decisions/messages during auction rounds for this player
-    # Format: {"CSK": [{"round": 1, "reason": "...", "decision": "raise/pass"}], ...}
-    team_bid_history: Union[Dict[str, List[Dict[str, Union[int, str, float]]]], Literal["Retained"]] = field(default_factory=dict)
+    # Format: {"CSK": [BidHistoryEntry(round=1, decision="raise", reason="..."), ...], ...}
+    team_bid_history: Union[Dict[str, List[BidHistoryEntry]], Literal["Retained"]] = field(default_factory=dict)
     
 
 @dataclass
@@ -134,11 +227,40 @@ class AgentState(TypedDict):
     SRH_Budget: float
     Messages: Annotated[Sequence[Union[HumanMessage, AIMessage, ToolMessage, BaseMessage]], add_messages] 
 class BidderInput(BaseModel):
+    # Strict for values built in code; model output is validated laxly by bidder_input_from_json.
+    # Frozen since a streamed decision is shared between the bid scan and the results
+    model_config = ConfigDict(strict=True, frozen=True)
+
     is_raise: bool = Field(default=False, description="Whether this bid is a raise or just a call. If not applicable, leave false.")
     is_normal: bool = Field(default=True, description="Whether this is a normal raise (fixed increment). If not applicable, false.")
     raised_amount: float = Field(default=0.0, description="The custom raise amount to add to the current price. If not applicable, 0.0.")
     reason: str = Field(default="", description="Short rationale for the decision. Empty string if none.")
 
+# Minimal JSON schema for guided decoding of a bid decision. The field semantics are spelled
+# out in the system prompt, so the pydantic titles/descriptions/defaults are left out of the request.
+BIDDER_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "is_raise": {"type": "boolean"},
+        "is_normal": {"type": "boolean"},
+        "raised_amount": {"type": "number"},
+        "reason": {"type": "string"},
+    },
+    "required": ["is_raise", "is_normal", "raised_amount", "reason"],
+}
+
+def bidder_input_from_json(data: Optional[dict]) -> Optional[BidderInput]:
+    """Validate a decoded BIDDER_JSON_SCHEMA object (model output) into a BidderInput.
+
+    Validation is lax, so the forms models commonly emit are converted ("true"/"false" strings,
+    numeric strings for raised_amount). Missing or null fields fall back to the BidderInput
+    defaults; None passes through. Raises pydantic.ValidationError for values that cannot be
+    converted (e.g. "maybe" for is_raise).
+    """
+    if data is None:
+        return None
+    return BidderInput.model_validate({k: v for k, v in data.items() if v is not None}, strict=False)
+
 def prettyprint(agent_state: AgentState) -> None:
     """Pretty print the agent state."""
     print("\n" + "="*60)
@@ -194,6 +316,14 @@ def get_raise_amount(current_price: float) -> float:
     else:
         return 0.25  # Raise by 25 lakh
 
+def is_valid_raise(is_raise: bool, is_normal: bool, raised_amount: float, min_bid_raise: float) -> bool:
+    """Check a bid decision against the minimum-raise rule.
+
+    Passes and normal raises are always valid; a custom raise must add at least
+    min_bid_raise (zero for the opening bid, so only negative amounts fail there).
+    """
+    return not is_raise or is_normal or raised_amount >= min_bid_raise
+
 def competitiveBidMaker(team: Literal['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', 'PBKS', 'RR', 'RCB', 'SRH'], player: Player, bid_decision: BidderInput) -> CompetitiveBidInfo:
     """Create a CompetitiveBidInfo object for a team's bid.
     
@@ -235,7 +365,7 @@ def load_prompts(prompt_dir="PROMPTS"):
             human_content = f.read()
 
         # Apply to all teams
-        for team in ['CSK', 'DC', 'GT', 'KKR', 'LSG', 'MI', 'PBKS', 'RR', 'RCB', 'SRH']:
+        for team in TEAMS:
             prompts[f"{team}_sys"] = sys_content
             prompts[f"{team}_human"] = human_content
 
@@ -358,6 +488,10 @@ SET_ABBREVIATION_MAPPING = {
     'UWK6': "Uncapped Wicketkeepers Set 6",
 }
 
+def get_team_budgets(state: AgentState) -> Dict[str, float]:
+    """Read all ten team purses from the state in one pass, keyed by team."""
+    return {t: state.get(BUDGET_KEYS[t], 0.0) for t in TEAMS}
+
 def get_set_name(set_abbreviation: Union[str, List[str]]) -> Union[str, List[str]]:
     """Converts a set abbreviation or a list of abbreviations to its full name."""
     if isinstance(set_abbreviation, list):
@@ -388,7 +522,7 @@ def export_sold_players_to_csv(state: AgentState, output_file: str = "auction_so
             if player.team_bid_history:
                 # Check if any bid history entry has 'Retained' marker
                 for team_name, history in player.team_bid_history.items():
-                    if history and any(entry.get('decision') == 'Retained' for entry in history):
+                    if history and any(entry.decision == 'Retained' for entry in history):
                         is_retained = True
                         break
             